@@ -7,8 +7,14 @@ logging.basicConfig(
     handlers=[logging.StreamHandler()],
 )
 
-from lexicons_builder.nlp_model_explorer.explorer import explore_nlp_model
-from lexicons_builder.scrappers.scrappers import get_synonyms_from_scrappers
+from lexicons_builder.nlp_model_explorer.explorer import (
+    explore_nlp_model,
+    explore_nlp_model_by_level,
+)
+from lexicons_builder.scrappers.scrappers import (
+    SynonymsGetter,
+    get_synonyms_from_scrappers,
+)
 from lexicons_builder.wordnet_explorer.explorer import explore_wordnet, explore_wolf
 
 
@@ -21,6 +27,17 @@ def build_lexicon(
     wordnet: bool = False,
     web: bool = True,
     strict=False,
+    resume: str = None,
+    metrics: str = None,
+    page_cache: str = None,
+    nlp_limit: int = None,
+    nlp_min_count: int = None,
+    nlp_allow: str = None,
+    nlp_cache: str = None,
+    nlp_topn: int = 10,
+    nlp_min_similarity: float = None,
+    nlp_decay: float = None,
+    nlp_by_level: bool = True,
 ):
     """This is the main function to build lexicons.
 
@@ -33,6 +50,17 @@ def build_lexicon(
       wordnet (bool, optional): Retrieve related terms using WordNet
       web (bool, optional): Retrieve related terms looking online
       strict (bool, optional): Delete words that are less relevant
+      resume (str, optional): The path of the journal of the web crawl. If the crawl stopped, running again with the same journal resumes it without downloading the pages again
+      metrics (str, optional): The path of the json file where the metrics of the web crawl (requests, latency, parsing, caches per website) are written
+      page_cache (str, optional): The path of the cache of the web pages. The pages in the cache are only downloaded again if they changed
+      nlp_limit (int, optional): Only load the nlp_limit most frequent words of the nlp models
+      nlp_min_count (int, optional): Only load the words seen at least nlp_min_count times (fastText and gensim models)
+      nlp_allow (str, optional): Only load the words of the nlp models matching this regular expression
+      nlp_cache (str, optional): The path of the persistent cache of the neighbours found in the nlp models
+      nlp_topn (int, optional): The number of neighbours of each word in the nlp models
+      nlp_min_similarity (float, optional): The neighbours less similar are not added (nor explored)
+      nlp_decay (float, optional): The relative decay of the similarity (between 0 and 1): the neighbours of a word are at least (1 - nlp_decay) times as similar as the word was to the word it was found from
+      nlp_by_level (bool, optional): Compute the neighbours of all the words of a depth at once (see :meth:`explore_nlp_model_by_level`), else explore the nlp models depth first. Both give the same graph
 
     Returns:
         :obj:`lexicons_builder.Graph`: a :py:meth:`lexicons_builder.Graph` object that contains the results.
@@ -90,13 +118,23 @@ def build_lexicon(
                 logging.info(
                     f"exploring model '{model}' with word '{word}' at {depth} depth"
                 )
-                graphs.append(explore_nlp_model(word, model, depth))
-        # looking for words online
-        if web:
-            logging.info(
-                f"looking up synonyms online for word '{word}' at depth {depth}"
-            )
-            graphs.append(get_synonyms_from_scrappers(word, lang, depth))
+                explore = (
+                    explore_nlp_model_by_level if nlp_by_level else explore_nlp_model
+                )
+                graphs.append(
+                    explore(
+                        word,
+                        model,
+                        depth,
+                        limit=nlp_limit,
+                        min_count=nlp_min_count,
+                        allow=nlp_allow,
+                        neighbour_cache=nlp_cache,
+                        topn=nlp_topn,
+                        min_similarity=nlp_min_similarity,
+                        decay=nlp_decay,
+                    )
+                )
         # looking for word with WOLF
         if wolf_path:
             logging.info(
@@ -108,6 +146,22 @@ def build_lexicon(
             logging.info(f"exploring WORNET with word '{word}' at depth {depth}")
             graphs.append(explore_wordnet(word, lang, depth))
 
+    # looking for words online, all the words at once
+    # so the pages they have in common are downloaded once
+    if web:
+        # the metrics of this run only
+        SynonymsGetter.metrics.reset()
+        logging.info(f"looking up synonyms online for words {words} at depth {depth}")
+        graphs.append(
+            get_synonyms_from_scrappers(
+                words, lang, depth, resume=resume, page_cache=page_cache
+            )
+        )
+        if metrics:
+            SynonymsGetter.metrics.to_json(metrics)
+            logging.info(f"web crawl metrics written to '{metrics}'")
+        logging.info(f"slowest website: {SynonymsGetter.metrics.bottleneck()}")
+
     # merging the graphs
     main_graph = graphs[0]
     for g in graphs[1:]:
@@ -36,6 +36,55 @@ def parse_args(arguments):
         help="The path to the nlp model(s)",
         nargs="+",
     )
+    parser.add_argument(
+        "--nlp-limit",
+        dest="nlp_limit",
+        help="Only load the N most frequent words of the nlp model(s)",
+        type=int,
+    )
+    parser.add_argument(
+        "--nlp-min-count",
+        dest="nlp_min_count",
+        help="Only load the words of the nlp model(s) seen at least N times (fastText and gensim models)",
+        type=int,
+    )
+    parser.add_argument(
+        "--nlp-allow",
+        dest="nlp_allow",
+        help="Only load the words of the nlp model(s) matching this regular expression, eg: '[a-zàâçéèêëîïôûùüÿœ-]+'",
+        type=str,
+    )
+    parser.add_argument(
+        "--nlp-cache",
+        dest="nlp_cache",
+        help="The persistent cache of the neighbours found in the nlp model(s), kept from one run to another",
+        type=str,
+    )
+    parser.add_argument(
+        "--nlp-topn",
+        dest="nlp_topn",
+        help="The number of neighbours of each word in the nlp model(s)",
+        type=int,
+        default=10,
+    )
+    parser.add_argument(
+        "--nlp-min-similarity",
+        dest="nlp_min_similarity",
+        help="The neighbours less similar are not added (nor explored)",
+        type=float,
+    )
+    parser.add_argument(
+        "--nlp-decay",
+        dest="nlp_decay",
+        help="The relative decay of the similarity, between 0 and 1. The neighbours of a word are at least (1 - decay) times as similar as the word was to the word it was found from",
+        type=float,
+    )
+    parser.add_argument(
+        "--nlp-depth-first",
+        dest="nlp_by_level",
+        help="Explore the nlp model(s) depth first, one word at a time, instead of level by level. The graph is the same",
+        action="store_false",
+    )
     parser.add_argument(
         "-wolf",
         "--wolf-path",
@@ -78,6 +127,24 @@ def parse_args(arguments):
         help="Search on dictionnaries online",
         action="store_true",
     )
+    parser.add_argument(
+        "--resume",
+        dest="resume",
+        help="The journal of the web crawl. If the crawl stopped, resume it from this file",
+        type=str,
+    )
+    parser.add_argument(
+        "--page-cache",
+        dest="page_cache",
+        help="The cache of the web pages, kept from one run to another. Unchanged pages are not downloaded again",
+        type=str,
+    )
+    parser.add_argument(
+        "--metrics",
+        dest="metrics",
+        help="The json file where the metrics of the web crawl are written",
+        type=str,
+    )
     parser.add_argument(
         "--strict",
         dest="strict",
@@ -128,6 +195,17 @@ def main(arguments):
         wordnet=args.wordnet,
         web=args.web,
         strict=args.strict,
+        resume=args.resume,
+        metrics=args.metrics,
+        page_cache=args.page_cache,
+        nlp_limit=args.nlp_limit,
+        nlp_min_count=args.nlp_min_count,
+        nlp_allow=args.nlp_allow,
+        nlp_cache=args.nlp_cache,
+        nlp_topn=args.nlp_topn,
+        nlp_min_similarity=args.nlp_min_similarity,
+        nlp_decay=args.nlp_decay,
+        nlp_by_level=args.nlp_by_level,
     )
 
     if args.format == "txt":
@@ -213,7 +213,14 @@ class Graph(rdflib.Graph):
             )
 
     def add_word(
-        self, word, depth, relation, target_word, synset_uri=None, comesFrom=None
+        self,
+        word,
+        depth,
+        relation,
+        target_word,
+        synset_uri=None,
+        comesFrom=None,
+        similarity=None,
     ):
         """Add some tripples to the graph that contains the relation between the word and its target.
 
@@ -223,6 +230,8 @@ class Graph(rdflib.Graph):
             relation (str): The relation of the word to the target word.
                             Could be "hyponym", "hypernym", "holonym" or "synonym"
             target_word (str): The word
+            similarity (float, optional): The similarity of the word with the target word (eg: in a nlp model).
+                            It is stored on the relation, reified as a :obj:`rdflib.RDF.Statement` (see :meth:`get_similarity`)
 
         .. code:: python
 
@@ -320,6 +329,29 @@ class Graph(rdflib.Graph):
                 )
             )
             # assert "lexicons_builder" not in str(self)
+        # adding the similarity on the relation (one statement per relation)
+        if similarity is not None:
+            statement = rdflib.URIRef(
+                f"{self.local_namespace}{ss_word}--{rela.split('/')[-1]}--"
+                + target[len(self.local_namespace) :]
+            )
+            self.add((statement, rdflib.RDF.type, rdflib.RDF.Statement))
+            self.add(
+                (
+                    statement,
+                    rdflib.RDF.subject,
+                    rdflib.URIRef(self.local_namespace + ss_word),
+                )
+            )
+            self.add((statement, rdflib.RDF.predicate, rela))
+            self.add((statement, rdflib.RDF.object, target))
+            self.add(
+                (
+                    statement,
+                    self.base_local.similarity,
+                    rdflib.Literal(float(similarity)),
+                )
+            )
 
     def add_root_word(self, word: str):
         """Before searching for related terms, the root word
@@ -356,6 +388,68 @@ class Graph(rdflib.Graph):
         )
         self._set_root_word_attribute()
 
+    def add_root_of_word(self, word: str, root_word: str):
+        """Record that the word was found from the root word.
+        Used when the graph has several root words, as all the words of the
+        first rank are linked to the same root word uri.
+
+        Args:
+          word (str): The word found
+          root_word (str): The root word it was found from
+
+        .. code:: python
+
+            >>> g = Graph()
+            >>> g.add_root_word("car")
+            >>> g.add_root_word("plane")
+            >>> g.add_word("vehicle", 1, "synonym", "car")
+            >>> g.add_root_of_word("vehicle", "car")
+            >>> g.add_root_of_word("vehicle", "plane")
+            >>> g.get_root_words_of("vehicle")
+            ['car', 'plane']
+
+        """
+        self._check_word_type(word)
+        self.add(
+            (
+                rdflib.URIRef(self.local_namespace + quote(word)),
+                self.base_local.rootWord,
+                rdflib.Literal(root_word),
+            )
+        )
+
+    def get_root_words_of(self, word: str) -> list:
+        """return the root words the word was found from
+        (see :meth:`add_root_of_word`)"""
+        return sorted(
+            str(root)
+            for root in self.objects(
+                rdflib.URIRef(self.local_namespace + quote(word)),
+                self.base_local.rootWord,
+            )
+        )
+
+    def get_similarity(self, word: str) -> float:
+        """return the best similarity of the relations of the word
+        (see :meth:`add_word`), None if it has no similarity
+
+        .. code:: python
+
+            >>> g.add_word("bus", 1, "synonym", "car", similarity=0.72)
+            >>> g.add_word("bus", 2, "synonym", "truck", similarity=0.81)
+            >>> g.get_similarity("bus")
+            0.81
+
+        """
+        similarities = [
+            similarity.toPython()
+            for statement in self.subjects(
+                rdflib.RDF.subject, rdflib.URIRef(self.local_namespace + quote(word))
+            )
+            for similarity in self.objects(statement, self.base_local.similarity)
+        ]
+        return max(similarities, default=None)
+
     def is_empty(self) -> bool:
         """return :obj:`True` if the graph does not contain synonyms, hyponyms, etc
 
@@ -590,6 +684,9 @@ class Graph(rdflib.Graph):
 
         for uri, word, count in self.query(query_number_of_origins):
             if int(count) < max_ - 1:
+                # the relations of the word are removed with it
+                for statement in list(self.subjects(rdflib.RDF.subject, uri)):
+                    self.remove((statement, None, None))
                 self.remove((uri, None, None))
 
     def to_list(self) -> list:
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tools for the NLP models
+
+Convert a model to the native format of gensim, memory mapped when loaded::
+
+    $ python -m lexicons_builder.nlp_model_explorer convert ~/models/frWac.bin
+
+and quantize its vectors (2 or 4 times less memory)::
+
+    $ python -m lexicons_builder.nlp_model_explorer convert ~/models/frWac.bin --dtype int8
+
+Compute the neighbours of the most frequent words of a model in advance,
+in a persistent cache::
+
+    $ python -m lexicons_builder.nlp_model_explorer precompute ~/models/frWac.kv ~/models/neighbours.sqlite -n 200000
+"""
+
+import argparse
+import sys
+
+from lexicons_builder.nlp_model_explorer.explorer import (
+    convert_model,
+    precompute_neighbours,
+)
+
+
+def parse_args(arguments):
+    parser = argparse.ArgumentParser(
+        description="Tools for the NLP models used by lexicons_builder"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    convert = subparsers.add_parser(
+        "convert", help="Convert a model to the native format (memory mapped)"
+    )
+    convert.add_argument("model_path", help="The path to the nlp model")
+    convert.add_argument(
+        "-o",
+        "--out-file",
+        dest="out_file",
+        help="The path of the converted model (the model path with the .kv extension by default)",
+    )
+    convert.add_argument(
+        "--dtype",
+        dest="dtype",
+        choices=("float16", "int8"),
+        help="Quantize the vectors (float32 by default)",
+    )
+    precompute = subparsers.add_parser(
+        "precompute",
+        help="Compute the neighbours of the most frequent words in the neighbour cache",
+    )
+    precompute.add_argument("model_path", help="The path to the nlp model")
+    precompute.add_argument("cache_path", help="The path of the neighbour cache")
+    precompute.add_argument(
+        "-n",
+        "--n-words",
+        dest="n_words",
+        type=int,
+        default=100000,
+        help="The number of words (the most frequent words of the model)",
+    )
+    precompute.add_argument(
+        "--topn",
+        dest="topn",
+        type=int,
+        default=10,
+        help="The number of neighbours of each word",
+    )
+    return parser.parse_args(arguments)
+
+
+def main(arguments):
+    args = parse_args(arguments)
+    if args.command == "convert":
+        print(convert_model(args.model_path, args.out_file, args.dtype))
+    elif args.command == "precompute":
+        added = precompute_neighbours(
+            args.model_path, args.cache_path, args.n_words, args.topn
+        )
+        print(f"{added} words added to '{args.cache_path}'")
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,219 @@
+"""
+Approximate nearest neighbour index of the NLP models (inverted file, IVF).
+
+The normalized vectors of the model are clustered with a spherical k-means.
+A search only scans the vectors of the ``n_probe`` clusters closest to the
+word instead of the whole vocabulary: more clusters probed is a better
+recall but a slower search.
+
+The index is built once and saved next to the model (``<model>.ivf``), in
+``.npy`` files that are memory mapped when it is loaded.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+__author__ = "GLNB"
+__copyright__ = "GLNB"
+__license__ = "mit"
+
+
+INDEX_EXTENSION = ".ivf"
+# memory used by the similarities of a block of vectors
+BLOCK_BYTES = 256 * 1024**2
+_ARRAYS = ("centroids", "ids", "offsets", "vectors")
+
+
+def index_path(model_path: str, *options) -> str:
+    """return the path of the index of the model, loaded with the options"""
+    path = os.path.expanduser(model_path)
+    if any(option is not None for option in options):
+        # the words kept are not the same
+        path += "." + hashlib.sha1(repr(options).encode()).hexdigest()[:8]
+    return path + INDEX_EXTENSION
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return (vectors / norms).astype(np.float32)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, block_bytes: int = BLOCK_BYTES):
+    "return the closest centroid of each vector"
+    rows = max(1, block_bytes // (4 * len(centroids)))
+    labels = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), rows):
+        sims = vectors[start : start + rows] @ centroids.T
+        labels[start : start + rows] = np.argmax(sims, axis=1)
+    return labels
+
+
+class IVFIndex:
+    """Inverted file index of the normalized vectors of a model
+
+    Args:
+        centroids (np.ndarray): the centroids of the clusters (normalized)
+        ids (np.ndarray): the indices of the words in the model, sorted by cluster
+        offsets (np.ndarray): the vectors of the cluster ``i`` are ``vectors[offsets[i]:offsets[i + 1]]``
+        vectors (np.ndarray): the normalized vectors, in the order of ``ids``
+
+    .. code:: python
+
+        >>> index = IVFIndex.build(model)
+        >>> index.save("~/models/frWac.bin.ivf")
+        >>> index = IVFIndex.load("~/models/frWac.bin.ivf")
+        >>> index.most_similar(model, ["livre"], topn=2, n_probe=8)
+        {'livre': [('livres', 0.81), ('ouvrage', 0.77)]}
+
+    """
+
+    def __init__(self, centroids, ids, offsets, vectors, meta=None):
+        self.centroids = centroids
+        self.ids = ids
+        self.offsets = offsets
+        self.vectors = vectors
+        self.meta = meta or {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(
+        cls,
+        model,
+        n_lists: int = None,
+        n_iter: int = 10,
+        sample_size: int = 100000,
+        seed: int = 0,
+    ):
+        """build the index of the model
+
+        Args:
+            model (KeyedVectors): the model
+            n_lists (int, optional): the number of clusters. By default ``4 * sqrt(number of words)``
+            n_iter (int, optional): the number of iterations of the k-means
+            sample_size (int, optional): the number of vectors the k-means is trained on (at least 40 per cluster)
+            seed (int, optional): the seed of the random generator
+
+        Returns:
+            IVFIndex: the index
+        """
+        normed = _normalize(model.vectors)
+        n_words = len(normed)
+        if n_lists is None:
+            n_lists = int(4 * np.sqrt(n_words))
+        n_lists = max(1, min(n_lists, n_words))
+        logging.info(f"building an index of {n_lists} clusters for {n_words} words")
+
+        rng = np.random.default_rng(seed)
+        n_sample = min(n_words, max(sample_size, 40 * n_lists))
+        sample = normed[np.sort(rng.choice(n_words, n_sample, replace=False))]
+        centroids = sample[rng.choice(n_sample, n_lists, replace=False)]
+        for _ in range(n_iter):
+            labels = _assign(sample, centroids)
+            order = np.argsort(labels, kind="stable")
+            counts = np.bincount(labels, minlength=n_lists)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            sums = np.empty_like(centroids)
+            filled = counts > 0
+            sums[filled] = np.add.reduceat(sample[order], starts[filled], axis=0)
+            # the empty clusters start again from random vectors
+            sums[~filled] = sample[rng.choice(n_sample, (~filled).sum())]
+            centroids = _normalize(sums)
+
+        labels = _assign(normed, centroids)
+        ids = np.argsort(labels, kind="stable")
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(labels, minlength=n_lists))
+        return cls(centroids, ids, offsets, normed[ids], {"n_words": n_words})
+
+    def save(self, path: str):
+        """save the index in the directory (one ``.npy`` file per array)"""
+        os.makedirs(path, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(self.meta, f)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: str = "r"):
+        """load the index saved in the directory, with its arrays memory mapped"""
+        arrays = [
+            np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in _ARRAYS
+        ]
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        return cls(*arrays, meta)
+
+    def search(
+        self, queries: np.ndarray, topn: int = 10, n_probe: int = 8, exclude=None
+    ):
+        """return the ``topn`` closest vectors of each query
+
+        Args:
+            queries (np.ndarray): the normalized queries, one per row
+            topn (int, optional): the number of neighbours of each query
+            n_probe (int, optional): the number of clusters scanned per query
+            exclude (list, optional): an index excluded from the results of each query
+
+        Returns:
+            list: the (indices, similarities) of the neighbours of each query, the most similar first
+        """
+        n_probe = max(1, min(n_probe, self.n_lists))
+        centroid_sims = queries @ self.centroids.T
+        probes = np.argpartition(-centroid_sims, n_probe - 1, axis=1)[:, :n_probe]
+        results = []
+        for i, query in enumerate(queries):
+            ids, sims = [], []
+            for cluster in probes[i]:
+                start, end = self.offsets[cluster], self.offsets[cluster + 1]
+                # the vectors of a cluster are contiguous
+                sims.append(self.vectors[start:end] @ query)
+                ids.append(self.ids[start:end])
+            ids, sims = np.concatenate(ids), np.concatenate(sims)
+            if exclude is not None:
+                sims[ids == exclude[i]] = -np.inf
+            k = min(topn, len(sims))
+            if not k:
+                results.append((ids[:0], sims[:0]))
+                continue
+            top = np.argpartition(-sims, k - 1)[:k]
+            top = top[np.argsort(-sims[top], kind="stable")]
+            top = top[np.isfinite(sims[top])]
+            results.append((ids[top], sims[top]))
+        return results
+
+    def most_similar(
+        self, model, words: list, topn: int = 10, n_probe: int = 8
+    ) -> dict:
+        """return the ``topn`` neighbours of each word, like
+        :meth:`_search.most_similar_batch`
+
+        Args:
+            model (KeyedVectors): the model of the index
+            words ([str]): the words, all in the model
+            topn (int, optional): the number of neighbours of each word
+            n_probe (int, optional): the number of clusters scanned per word
+
+        Returns:
+            dict: word -> list of (neighbour, cosine similarity), the most similar first
+        """
+        if not words:
+            return {}
+        indices = np.array([model.key_to_index[word] for word in words])
+        queries = _normalize(model.vectors[indices])
+        results = self.search(queries, topn, n_probe, exclude=indices)
+        return {
+            word: [(model.index_to_key[i], float(sim)) for i, sim in zip(ids, sims)]
+            for word, (ids, sims) in zip(words, results)
+        }
@@ -0,0 +1,94 @@
+"""
+Detection of the format of the NLP models.
+
+The first bytes of the file are enough to know how the model was saved,
+so the right loader is used on the first try instead of waiting for a
+loader to fail on a file of several GB.
+"""
+
+import bz2
+import gzip
+import os
+
+__author__ = "GLNB"
+__copyright__ = "GLNB"
+__license__ = "mit"
+
+
+NATIVE = "native"
+FASTTEXT = "fasttext"
+WORD2VEC_BINARY = "word2vec_binary"
+WORD2VEC_TEXT = "word2vec_text"
+# text models without the "<number of words> <dimension>" header (GloVe)
+WORD2VEC_TEXT_NO_HEADER = "word2vec_text_no_header"
+
+# magic number at the beginning of the fastText .bin models
+_FASTTEXT_MAGIC = (793712314).to_bytes(4, "little")
+# pickle protocols 2 to 5 (the native format of gensim is a pickle)
+_PICKLE_MAGICS = tuple(bytes([0x80, protocol]) for protocol in range(2, 6))
+_TEXT_BYTES = frozenset(b"0123456789.-+eEnaifNAIF \t\r\n")
+
+
+def _open(path: str):
+    "open the file, decompressing it if needed"
+    with open(path, "rb") as f:
+        magic = f.read(3)
+    if magic[:2] == b"\x1f\x8b":
+        return gzip.open(path, "rb")
+    if magic == b"BZh":
+        return bz2.open(path, "rb")
+    return open(path, "rb")
+
+
+def _is_number(token: bytes) -> bool:
+    try:
+        float(token)
+        return True
+    except ValueError:
+        return False
+
+
+def sniff_model_format(model_path: str, n_bytes: int = 4096) -> str:
+    """return the format of the model, read from the first bytes of the file
+
+    Args:
+        model_path (str): the path of the model
+        n_bytes (int, optional): the number of bytes read
+
+    Returns:
+        str: one of ``native``, ``fasttext``, ``word2vec_binary``, ``word2vec_text``, ``word2vec_text_no_header``
+
+    Raises:
+        ValueError: if the format is not supported
+
+    .. code:: python
+
+        >>> sniff_model_format("~/models/frWac_non_lem_no_postag_no_phrase_200_skip_cut100.bin")
+        'word2vec_binary'
+
+    """
+    path = os.path.expanduser(model_path)
+    with _open(path) as f:
+        head = f.read(n_bytes)
+    if head.startswith(_PICKLE_MAGICS):
+        return NATIVE
+    if head.startswith(_FASTTEXT_MAGIC):
+        return FASTTEXT
+
+    header, _, body = head.partition(b"\n")
+    tokens = header.split()
+    if len(tokens) == 2 and all(t.isdigit() for t in tokens):
+        # the first word is followed by its vector,
+        # written in text or as raw float32
+        _, _, first_entry = body.partition(b" ")
+        vector = first_entry.partition(b"\n")[0]
+        if vector and set(vector) <= _TEXT_BYTES:
+            return WORD2VEC_TEXT
+        if first_entry:
+            return WORD2VEC_BINARY
+    elif len(tokens) > 2 and all(_is_number(t) for t in tokens[1:]):
+        return WORD2VEC_TEXT_NO_HEADER
+    raise ValueError(
+        f"Cannot read the model from '{model_path}': the format is not supported. "
+        "The model should be in word2vec (binary or text), fastText (.bin) or gensim format"
+    )
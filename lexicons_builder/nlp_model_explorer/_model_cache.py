@@ -0,0 +1,122 @@
+"""
+Cache of the NLP models loaded in the process.
+
+Loading a word2vec model of several GB takes minutes, so the models are
+loaded once and shared by all the explorations of the process. The models
+are identified by their path and the modification time of the file (a
+model written again is loaded again). When the models loaded take more
+than ``max_bytes``, the least recently used ones are unloaded.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+__author__ = "GLNB"
+__copyright__ = "GLNB"
+__license__ = "mit"
+
+
+def _default_max_bytes():
+    "half of the physical memory, or no limit if it cannot be known"
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 2
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def model_nbytes(model) -> int:
+    """estimate of the memory used by the model: its arrays and
+    about 100 bytes per word of the vocabulary"""
+    nbytes = sum(
+        array.nbytes
+        for array in vars(model).values()
+        if isinstance(array, np.ndarray)
+        # memory mapped arrays are shared with the page cache
+        and not isinstance(array, np.memmap)
+    )
+    return nbytes + 100 * len(getattr(model, "index_to_key", ()))
+
+
+def _key(model_path: str, *options):
+    path = os.path.abspath(os.path.expanduser(model_path))
+    return (path, os.path.getmtime(path)) + options
+
+
+class ModelCache:
+    """Models loaded in the process, with a least recently used eviction
+
+    Args:
+        max_bytes (int, optional): the memory the models can use. By default half of the physical memory
+
+    .. code:: python
+
+        >>> cache = ModelCache(max_bytes=8 * 1024 ** 3)
+        >>> model = cache.get("~/models/frWac.bin", _load_model)  # loaded
+        >>> model = cache.get("~/models/frWac.bin", _load_model)  # already in memory
+
+    """
+
+    def __init__(self, max_bytes: int = None):
+        self.max_bytes = _default_max_bytes() if max_bytes is None else max_bytes
+        self._models = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __contains__(self, model_path: str) -> bool:
+        path = os.path.abspath(os.path.expanduser(model_path))
+        return any(key[0] == path for key in self._models)
+
+    def __len__(self):
+        return len(self._models)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(nbytes for _, nbytes in self._models.values())
+
+    def get(self, model_path: str, loader, *options):
+        """return the model, loaded with ``loader(model_path, *options)``
+        if it is not in the cache"""
+        key = _key(model_path, *options)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key][0]
+            return self.add(model_path, loader(model_path, *options), *options)
+
+    def add(self, model_path: str, model, *options):
+        """add the model loaded from ``model_path`` with the options"""
+        key = _key(model_path, *options)
+        with self._lock:
+            # a previous version of the file
+            for old_key in [
+                k for k in self._models if k[0] == key[0] and k[1] != key[1]
+            ]:
+                logging.info(f"'{model_path}' changed, unloading the previous version")
+                del self._models[old_key]
+            self._models[key] = (model, model_nbytes(model))
+            self._models.move_to_end(key)
+            self._evict()
+            return model
+
+    def _evict(self):
+        # the model just loaded is never evicted
+        while (
+            len(self._models) > 1
+            and self.max_bytes is not None
+            and self.nbytes > self.max_bytes
+        ):
+            (path, *_), _ = self._models.popitem(last=False)
+            logging.info(f"unloading the model '{path}' to free memory")
+
+    def unload(self, model_path: str = None):
+        """unload the model (all the models if no path is given)"""
+        with self._lock:
+            if model_path is None:
+                self._models.clear()
+                return
+            path = os.path.abspath(os.path.expanduser(model_path))
+            for key in [k for k in self._models if k[0] == path]:
+                del self._models[key]
@@ -0,0 +1,186 @@
+"""
+Persistent cache of the neighbours found in the NLP models.
+
+The same words are explored again and again from one lexicon to another,
+so the neighbours found by the exact search are kept in a local sqlite
+file, keyed by (fingerprint of the model, word, topn). The neighbours are
+stored as compact arrays: the indices of the words in the model (int32)
+and their similarities (float32).
+
+The neighbours of the most frequent words can be computed in advance (see
+:meth:`precompute`), the explorations then mostly read the disk.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import weakref
+
+import numpy as np
+
+__author__ = "GLNB"
+__copyright__ = "GLNB"
+__license__ = "mit"
+
+
+# number of words per query (sqlite limits the number of parameters)
+_CHUNK = 500
+_fingerprints = weakref.WeakKeyDictionary()
+
+
+def model_fingerprint(model) -> str:
+    """return a fingerprint of the vocabulary and of the vectors of the model
+    (the indices stored in the cache are only valid for the same model)"""
+    try:
+        return _fingerprints[model]
+    except KeyError:
+        pass
+    h = hashlib.sha1()
+    n_words = len(model.index_to_key)
+    h.update(f"{n_words} {model.vector_size} {model.vectors.dtype}".encode())
+    # a sample of the words and of the vectors, spread over the model
+    sample = np.unique(np.linspace(0, n_words - 1, num=min(n_words, 1000), dtype=int))
+    h.update("\n".join(model.index_to_key[i] for i in sample).encode())
+    h.update(np.ascontiguousarray(model.vectors[sample]).tobytes())
+    fingerprint = h.hexdigest()
+    _fingerprints[model] = fingerprint
+    return fingerprint
+
+
+class NeighbourCache:
+    """Neighbours of the words of the models, in a sqlite file
+
+    Args:
+        path (str): the path of the sqlite file
+
+    .. code:: python
+
+        >>> cache = NeighbourCache("~/models/neighbours.sqlite")
+        >>> cache.add(model, 10, {"livre": [("livres", 0.81), ("ouvrage", 0.77)]})
+        >>> cache.get(model, ["livre", "lire"], 10)
+        {'livre': [('livres', 0.81), ('ouvrage', 0.77)]}
+
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.expanduser(path), check_same_thread=False)
+        # several processes can read and write the cache
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS neighbours ("
+            "fingerprint TEXT, word TEXT, topn INTEGER, ids BLOB, sims BLOB, "
+            "PRIMARY KEY (fingerprint, word, topn))"
+        )
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM neighbours").fetchone()[0]
+
+    def get(self, model, words: list, topn: int) -> dict:
+        """return the neighbours of the words in the cache
+
+        Returns:
+            dict: word -> list of (neighbour, similarity), for the words in the cache only
+        """
+        fingerprint = model_fingerprint(model)
+        neighbours = {}
+        with self._lock:
+            for start in range(0, len(words), _CHUNK):
+                chunk = words[start : start + _CHUNK]
+                rows = self._db.execute(
+                    "SELECT word, ids, sims FROM neighbours "
+                    "WHERE fingerprint = ? AND topn = ? "
+                    f"AND word IN ({', '.join('?' * len(chunk))})",
+                    (fingerprint, topn, *chunk),
+                )
+                for word, ids, sims in rows:
+                    neighbours[word] = [
+                        (model.index_to_key[i], float(sim))
+                        for i, sim in zip(
+                            np.frombuffer(ids, dtype=np.int32),
+                            np.frombuffer(sims, dtype=np.float32),
+                        )
+                    ]
+            self.hits += len(neighbours)
+            self.misses += len(set(words)) - len(neighbours)
+        return neighbours
+
+    def add(self, model, topn: int, neighbours: dict):
+        """add the neighbours (word -> list of (neighbour, similarity)) of the words"""
+        fingerprint = model_fingerprint(model)
+        rows = [
+            (
+                fingerprint,
+                word,
+                topn,
+                np.array(
+                    [model.key_to_index[w] for w, _ in word_neighbours], dtype=np.int32
+                ).tobytes(),
+                np.array([s for _, s in word_neighbours], dtype=np.float32).tobytes(),
+            )
+            for word, word_neighbours in neighbours.items()
+        ]
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO neighbours VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM neighbours")
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else None,
+        }
+
+
+def precompute(
+    cache: NeighbourCache,
+    model,
+    search,
+    n_words: int,
+    topn: int = 10,
+    batch_size: int = 4096,
+):
+    """compute the neighbours of the ``n_words`` most frequent words of the
+    model (its first words) and add them to the cache
+
+    Args:
+        cache (NeighbourCache): the cache
+        model (KeyedVectors): the model
+        search (callable): ``search(model, words, topn)`` returns the neighbours of the words
+        n_words (int): the number of words
+        topn (int, optional): the number of neighbours of each word
+        batch_size (int, optional): the number of words searched at once
+
+    Returns:
+        int: the number of words added to the cache
+    """
+    words = model.index_to_key[:n_words]
+    added = 0
+    for start in range(0, len(words), batch_size):
+        batch = words[start : start + batch_size]
+        cached = cache.get(model, batch, topn)
+        missing = [word for word in batch if word not in cached]
+        if missing:
+            cache.add(model, topn, search(model, missing, topn))
+            added += len(missing)
+        logging.info(f"neighbours of {start + len(batch)}/{len(words)} words computed")
+    return added
@@ -0,0 +1,103 @@
+"""
+Quantized storage of the vectors of the NLP models.
+
+Only the cosine similarities are used to explore a model, so the vectors
+are normalized then stored in ``float16`` (2 times less memory than
+``float32``) or in ``int8`` with one scale per vector (4 times less memory):
+``vector ≈ codes * scale``.
+
+The similarities are computed on blocks of the compact arrays, converted to
+``float32`` one block at a time, so the full ``float32`` matrix is never in
+memory.
+"""
+
+import numpy as np
+from gensim.models import KeyedVectors
+
+__author__ = "GLNB"
+__copyright__ = "GLNB"
+__license__ = "mit"
+
+
+DTYPES = ("float16", "int8")
+# number of vectors converted to float32 at once
+BLOCK_ROWS = 65536
+
+
+def is_quantized(model) -> bool:
+    """return True if the vectors of the model are quantized"""
+    return model.vectors.dtype in (np.float16, np.int8)
+
+
+def quantize(vectors: np.ndarray, dtype: str = "int8", block_rows: int = BLOCK_ROWS):
+    """quantize the normalized vectors
+
+    Args:
+        vectors (np.ndarray): the vectors, one per row
+        dtype (str, optional): ``float16`` or ``int8``
+        block_rows (int, optional): the number of vectors quantized at once
+
+    Returns:
+        tuple: the codes and the scale of each vector (None for ``float16``)
+
+    .. code:: python
+
+        >>> codes, scales = quantize(np.array([[3.0, -4.0]]), "int8")
+        >>> codes, scales
+        (array([[  95, -127]], dtype=int8), array([0.0063], dtype=float32))
+
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f"'{dtype}' is not supported, use one of {DTYPES}")
+    codes = np.empty(vectors.shape, dtype=dtype)
+    scales = np.empty(len(vectors), dtype=np.float32) if dtype == "int8" else None
+    for start in range(0, len(vectors), block_rows):
+        block = np.asarray(vectors[start : start + block_rows], dtype=np.float32)
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        block = block / norms
+        if scales is None:
+            codes[start : start + block_rows] = block
+            continue
+        block_scales = np.abs(block).max(axis=1) / 127
+        block_scales[block_scales == 0] = 1
+        codes[start : start + block_rows] = np.rint(block / block_scales[:, None])
+        scales[start : start + block_rows] = block_scales
+    return codes, scales
+
+
+def dequantize(codes: np.ndarray, scales: np.ndarray = None) -> np.ndarray:
+    """return the (normalized) vectors in float32"""
+    vectors = np.asarray(codes, dtype=np.float32)
+    if scales is not None:
+        vectors = vectors * scales[:, None]
+    return vectors
+
+
+def quantize_model(model, dtype: str = "int8"):
+    """return a copy of the model with its vectors quantized
+
+    The scales are in the ``scales`` attribute of the model (saved with it).
+    """
+    codes, scales = quantize(model.vectors, dtype)
+    quantized = KeyedVectors(model.vector_size, dtype=codes.dtype)
+    quantized.index_to_key = list(model.index_to_key)
+    quantized.key_to_index = dict(model.key_to_index)
+    quantized.expandos = {k: np.array(v) for k, v in model.expandos.items()}
+    quantized.vectors = codes
+    quantized.scales = scales
+    return quantized
+
+
+def similarities(model, queries: np.ndarray, block_rows: int = BLOCK_ROWS):
+    """return the cosine similarities of the normalized queries (one per
+    row) with all the words of the quantized model"""
+    scales = getattr(model, "scales", None)
+    sims = np.empty((len(queries), len(model.vectors)), dtype=np.float32)
+    for start in range(0, len(model.vectors), block_rows):
+        end = start + block_rows
+        block = dequantize(
+            model.vectors[start:end], None if scales is None else scales[start:end]
+        )
+        sims[:, start:end] = queries @ block.T
+    return sims
@@ -0,0 +1,83 @@
+"""
+Batched nearest neighbour search in the NLP models.
+
+Instead of one ``most_similar`` call (a matrix-vector product over the
+whole vocabulary and a full sort) per word, the neighbours of many words
+are computed with one matrix-matrix product per block of words (using
+all the threads of the BLAS library) and ``argpartition``.
+
+The quantized models (see :mod:`_quantize`) are searched on their compact
+arrays.
+"""
+
+import numpy as np
+
+try:
+    from . import _quantize
+except ImportError:
+    import _quantize
+
+__author__ = "GLNB"
+__copyright__ = "GLNB"
+__license__ = "mit"
+
+
+# memory used by the similarities of a block of words
+BLOCK_BYTES = 256 * 1024**2
+
+
+def most_similar_batch(
+    model, words: list, topn: int = 10, block_bytes: int = BLOCK_BYTES
+) -> dict:
+    """return the ``topn`` neighbours of each word, like ``model.most_similar(word, topn=topn)``
+
+    Args:
+        model (KeyedVectors): the model
+        words ([str]): the words, all in the model
+        topn (int, optional): the number of neighbours of each word
+        block_bytes (int, optional): the memory used by the similarities of a block of words
+
+    Returns:
+        dict: word -> list of (neighbour, cosine similarity), the most similar first
+
+    .. code:: python
+
+        >>> most_similar_batch(model, ["livre", "lire"], topn=2)
+        {'livre': [('livres', 0.81), ('ouvrage', 0.77)], 'lire': [('relire', 0.79), ('écrire', 0.74)]}
+
+    """
+    quantized = _quantize.is_quantized(model)
+    if not quantized:
+        model.fill_norms()
+    n_words = len(model.index_to_key)
+    topn = min(topn, n_words - 1)
+    if not words or topn <= 0:
+        return {word: [] for word in words}
+    indices = np.array([model.key_to_index[word] for word in words])
+    rows = max(1, block_bytes // (4 * n_words))
+    neighbours = {}
+    for start in range(0, len(indices), rows):
+        block = indices[start : start + rows]
+        if quantized:
+            scales = getattr(model, "scales", None)
+            queries = _quantize.dequantize(
+                model.vectors[block], None if scales is None else scales[block]
+            )
+            sims = _quantize.similarities(model, queries)
+        else:
+            queries = model.vectors[block] / model.norms[block, None]
+            # cosine similarities of the block with the whole vocabulary
+            sims = queries @ model.vectors.T
+            sims /= model.norms
+        # the word is not its own neighbour
+        sims[np.arange(len(block)), block] = -np.inf
+        top = np.argpartition(-sims, topn - 1, axis=1)[:, :topn]
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_sims, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_sims = np.take_along_axis(top_sims, order, axis=1)
+        for index, row, row_sims in zip(block, top, top_sims):
+            neighbours[model.index_to_key[index]] = [
+                (model.index_to_key[i], float(sim)) for i, sim in zip(row, row_sims)
+            ]
+    return neighbours
@@ -0,0 +1,193 @@
+"""
+Models shared by the processes of a host.
+
+The vectors of the model and its vocabulary are written once in memory
+mapped files (in ``/dev/shm`` when it exists), under a name. The processes
+attach to the model by its name: they all read the same pages of memory,
+so N processes cost the memory of one model, and the model is only read
+from its file once per host.
+
+The vocabulary is stored as arrays too (the words in utf-8 and their
+offsets, plus the indices of the words sorted for the lookups), so the
+processes do not build their own ``dict`` of millions of words.
+"""
+
+import bisect
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+__author__ = "GLNB"
+__copyright__ = "GLNB"
+__license__ = "mit"
+
+
+SHARED_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+_PREFIX = "lexicons_builder_"
+
+
+def shared_path(name: str, directory: str = None) -> str:
+    """return the directory of the files of the shared model"""
+    return os.path.join(directory or SHARED_DIR, _PREFIX + name)
+
+
+class _IndexToKey(Sequence):
+    "the words of the model, in the order of the vectors"
+
+    def __init__(self, words: np.ndarray, offsets: np.ndarray):
+        self._words = words
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def _encoded(self, i: int) -> bytes:
+        return self._words[self._offsets[i] : self._offsets[i + 1]].tobytes()
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._encoded(i).decode("utf-8")
+
+
+class _SortedWords(Sequence):
+    "the encoded words sorted, for the binary search of a word"
+
+    def __init__(self, index_to_key: _IndexToKey, sorted_ids: np.ndarray):
+        self._index_to_key = index_to_key
+        self._sorted_ids = sorted_ids
+
+    def __len__(self):
+        return len(self._sorted_ids)
+
+    def __getitem__(self, i):
+        return self._index_to_key._encoded(self._sorted_ids[i])
+
+
+class _KeyToIndex(Mapping):
+    "word -> index of its vector, read from the shared arrays"
+
+    def __init__(self, index_to_key: _IndexToKey, sorted_ids: np.ndarray):
+        self._index_to_key = index_to_key
+        self._sorted_ids = sorted_ids
+        self._sorted_words = _SortedWords(index_to_key, sorted_ids)
+
+    def __getitem__(self, word):
+        if not isinstance(word, str):
+            raise KeyError(word)
+        encoded = word.encode("utf-8")
+        i = bisect.bisect_left(self._sorted_words, encoded)
+        if i == len(self._sorted_words) or self._sorted_words[i] != encoded:
+            raise KeyError(word)
+        return int(self._sorted_ids[i])
+
+    def __iter__(self):
+        return iter(self._index_to_key)
+
+    def __len__(self):
+        return len(self._index_to_key)
+
+
+class SharedKeyedVectors:
+    """Read only model attached to the files of a shared model, with the
+    attributes of :obj:`gensim.models.KeyedVectors` used by the explorer
+    (``vectors``, ``norms``, ``index_to_key``, ``key_to_index``)
+
+    Args:
+        path (str): the directory of the shared model (see :meth:`share`)
+    """
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.model_path = self.meta["model_path"]
+
+        def load(name):
+            file_path = os.path.join(path, f"{name}.npy")
+            if os.path.exists(file_path):
+                return np.load(file_path, mmap_mode="r")
+
+        self.vectors = load("vectors")
+        self.norms = load("norms")
+        self.scales = load("scales")
+        self.vector_size = self.vectors.shape[1]
+        self.index_to_key = _IndexToKey(load("words"), load("offsets"))
+        self.key_to_index = _KeyToIndex(self.index_to_key, load("sorted_ids"))
+        self.expandos = {}
+
+    def __contains__(self, word) -> bool:
+        return word in self.key_to_index
+
+    def __len__(self):
+        return len(self.index_to_key)
+
+    def __getitem__(self, word: str) -> np.ndarray:
+        return self.vectors[self.key_to_index[word]]
+
+    def fill_norms(self, force=False):
+        # the norms are computed when the model is shared
+        pass
+
+
+def share(model, model_path: str, name: str, directory: str = None) -> str:
+    """write the model in memory mapped files, under the name
+
+    Args:
+        model (KeyedVectors): the model
+        model_path (str): the path the model was loaded from
+        name (str): the name of the shared model
+        directory (str, optional): where the files are written. By default ``/dev/shm``
+
+    Returns:
+        str: the directory of the shared model
+    """
+    path = shared_path(name, directory)
+    # the files are written aside then moved,
+    # so a process never attaches to a model half written
+    tmp_path = tempfile.mkdtemp(dir=os.path.dirname(path), prefix=_PREFIX)
+    try:
+        encoded = [word.encode("utf-8") for word in model.index_to_key]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(word) for word in encoded])
+        arrays = {
+            "vectors": model.vectors,
+            "words": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            "offsets": offsets,
+            "sorted_ids": np.array(
+                sorted(range(len(encoded)), key=encoded.__getitem__), dtype=np.int64
+            ),
+        }
+        if getattr(model, "scales", None) is not None:
+            arrays["scales"] = model.scales
+        elif model.vectors.dtype == np.float32:
+            model.fill_norms()
+            arrays["norms"] = model.norms
+        for array_name, array in arrays.items():
+            np.save(os.path.join(tmp_path, f"{array_name}.npy"), array)
+        with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+            json.dump({"model_path": model_path, "name": name}, f)
+        try:
+            os.rename(tmp_path, path)
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+            # shared at the same time by another process
+            shutil.rmtree(tmp_path, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    return path
+
+
+def unshare(name: str, directory: str = None):
+    """delete the files of the shared model (the processes attached keep
+    their mapping until they exit)"""
+    shutil.rmtree(shared_path(name, directory), ignore_errors=True)
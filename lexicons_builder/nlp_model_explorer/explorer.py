@@ -1,11 +1,56 @@
 # -*- coding: utf-8 -*-
 """
 The nlp_model_explorer package contains the functions that are used to retreive neighbours from NLP models.
-The language model needs to be in .vec or .bin format.
+The similarity of each neighbour with the word it was first found from is
+recorded on their relation in the graph (see :meth:`Graph.get_similarity`).
+The language model can be in word2vec (.vec, .bin or .txt), fastText (.bin) or gensim format,
+the format is detected from the first bytes of the file.
 Works with FastText and word2vec.
 
 Like the other packages, it outputs a :obj:`Graph` containing the results.
 
+The models are loaded once per process and kept in memory for the next
+explorations (see :meth:`preload` and :meth:`unload`). The processes of a
+pool can share a single copy of a model (see :meth:`share_model`).
+
+:meth:`explore_nlp_model_by_level` returns the same graph as
+:meth:`explore_nlp_model` but computes the neighbours of all the words of
+a depth at once, with matrix-matrix products using all the threads of the
+BLAS library.
+
+Both can search the neighbours in an approximate nearest neighbour index
+of the model instead of the whole vocabulary (see :meth:`get_ann_index`),
+``n_probe`` trades the recall for the speed of the search.
+
+Only a part of the vocabulary can be loaded: the ``limit`` most frequent
+words, the words seen at least ``min_count`` times and the words matching
+the regular expression ``allow``. The memory used and the duration of the
+searches depend on the words kept.
+
+The neighbours found can be kept in a persistent cache (see
+:meth:`get_neighbour_cache`), and the neighbours of the most frequent
+words computed in advance (see :meth:`precompute_neighbours`):
+
+    .. code:: bash
+
+        $ python -m lexicons_builder.nlp_model_explorer precompute ~/models/frWac.kv ~/models/neighbours.sqlite -n 200000
+
+A model can be converted once to the native format of gensim (see
+:meth:`convert_model`). It is then memory mapped instead of being read:
+it loads in less than a second and the processes using it share the
+same memory.
+
+    .. code:: bash
+
+        $ python -m lexicons_builder.nlp_model_explorer convert ~/models/frWac.bin
+
+The vectors can also be quantized during the conversion, in ``float16`` or
+in ``int8`` (see :mod:`_quantize`): the model then takes 2 or 4 times less
+memory, for a small loss of recall.
+
+    .. code:: bash
+
+        $ python -m lexicons_builder.nlp_model_explorer convert ~/models/frWac.bin --dtype int8
 
 
 .. note::
@@ -14,12 +59,31 @@ Like the other packages, it outputs a :obj:`Graph` containing the results.
 
 """
 
+import hashlib
 import inspect
 import os
+import re
 import sys
 import logging
+import threading
 
+import numpy as np
 from gensim.models import KeyedVectors
+from gensim.models.fasttext import load_facebook_vectors
+
+try:
+    from . import _ann, _formats, _quantize, _shared
+    from ._model_cache import ModelCache
+    from ._neighbour_cache import NeighbourCache, precompute
+    from ._search import most_similar_batch
+except ImportError:
+    import _ann
+    import _formats
+    import _quantize
+    import _shared
+    from _model_cache import ModelCache
+    from _neighbour_cache import NeighbourCache, precompute
+    from _search import most_similar_batch
 
 __location__ = os.path.join(
     os.getcwd(), os.path.dirname(inspect.getfile(inspect.currentframe()))
@@ -35,34 +99,390 @@ __license__ = "mit"
 
 # _logger = logging.getLogger(__name__)
 
+# the models loaded in the process, shared by all the explorations
+model_cache = ModelCache()
+# extension of the models in the native format of gensim
+NATIVE_EXTENSION = ".kv"
+# the neighbour caches opened in the process, by path
+_neighbour_caches = {}
+_neighbour_caches_lock = threading.Lock()
+# the approximate nearest neighbour indexes loaded in the process, by path
+# and modification time of the model, words kept and number of clusters
+_ann_indexes = {}
+_ann_indexes_lock = threading.Lock()
+
+
+def _filter_model(model, limit=None, min_count=None, allow=None, has_counts=True):
+    """return a model with only the words kept (see :meth:`_load_model`),
+    or the model itself if all the words are kept"""
+    keep = np.ones(len(model.index_to_key), dtype=bool)
+    counts = model.expandos.get("count")
+    if limit is not None:
+        keep[limit:] = False
+    if min_count is not None:
+        if has_counts and counts is not None:
+            keep &= counts >= min_count
+        else:
+            logging.warning(
+                "the model does not contain the counts of the words, min_count is ignored"
+            )
+    if allow is not None:
+        pattern = re.compile(allow)
+        keep &= np.fromiter(
+            (pattern.fullmatch(w) is not None for w in model.index_to_key),
+            dtype=bool,
+            count=len(keep),
+        )
+    if keep.all():
+        return model
+    kept = np.flatnonzero(keep)
+    logging.info(f"keeping {len(kept)} words out of {len(keep)}")
+    filtered = KeyedVectors(model.vector_size, dtype=model.vectors.dtype)
+    filtered.add_vectors([model.index_to_key[i] for i in kept], model.vectors[kept])
+    if counts is not None:
+        filtered.allocate_vecattrs(["count"], [counts.dtype])
+        filtered.expandos["count"][:] = counts[kept]
+    if getattr(model, "scales", None) is not None:
+        # quantized model
+        filtered.scales = np.asarray(model.scales[kept])
+    return filtered
+
+
+def _load_model(model_path: str, limit=None, min_count=None, allow=None):
+    """Load the model with the loader matching its format
+    (see :meth:`_formats.sniff_model_format`)
+
+    Only the words of the vocabulary kept are loaded:
+
+    * ``limit``: the first words of the model (the models are sorted from the most frequent word)
+    * ``min_count``: the words seen at least ``min_count`` times (if the model contains the counts, as fastText and gensim models)
+    * ``allow``: the words matching the regular expression
 
-def _load_model(model_path: str):
-    """Try different way of loading the model
     Returns the loaded model
     """
-
-    try:
-        logging.info(f"Trying to load '{model_path}' with KeyedVectors binary=True")
-        model = KeyedVectors.load_word2vec_format(
-            model_path, binary=True, unicode_errors="ignore"
-        )
-        logging.info("success")
-        return model
-    except EOFError as e:
-        # the model is in a text format
-        logging.error(e)
-        logging.warning(
-            f"Cannot load '{model_path}' with KeyedVectors binary=True. Trying another method"
-        )
+    model_format = _formats.sniff_model_format(model_path)
+    path = os.path.expanduser(model_path)
+    logging.info(f"Loading '{model_path}' ({model_format})")
     try:
-        logging.info(f"Trying to load '{model_path}' with KeyedVectors binary=False")
-        model = KeyedVectors.load_word2vec_format(
-            model_path, binary=False, unicode_errors="ignore"
-        )
-        logging.info("success")
-        return model
+        if model_format == _formats.NATIVE:
+            # the arrays are memory mapped
+            model = KeyedVectors.load(path, mmap="r")
+            # a full Word2Vec / FastText model
+            model = getattr(model, "wv", model)
+        elif model_format == _formats.FASTTEXT:
+            model = load_facebook_vectors(path)
+        else:
+            # the words after the limit are not read
+            model = KeyedVectors.load_word2vec_format(
+                path,
+                binary=model_format == _formats.WORD2VEC_BINARY,
+                no_header=model_format == _formats.WORD2VEC_TEXT_NO_HEADER,
+                unicode_errors="ignore",
+                limit=limit,
+            )
     except Exception as e:
-        raise ValueError(f"Cannot read the model from '{model_path}'")
+        raise ValueError(f"Cannot read the model from '{model_path}': {e}") from e
+    # the word2vec files do not contain the counts,
+    # gensim makes them up from the order of the words
+    has_counts = model_format in (_formats.NATIVE, _formats.FASTTEXT)
+    return _filter_model(model, limit, min_count, allow, has_counts)
+
+
+def convert_model(model_path: str, out_path: str = None, dtype: str = None) -> str:
+    """Convert the model to the native format of gensim, with the norms of
+    the vectors precomputed. The vectors are stored in a separate ``.npy``
+    file so the model can be memory mapped by :meth:`_load_model`
+
+    Args:
+        model_path (str): the path of the model (word2vec or fastText)
+        out_path (str, optional): the path of the converted model. By default the path of the model with the ``.kv`` extension (``.<dtype>.kv`` if quantized)
+        dtype (str, optional): quantize the vectors in ``float16`` or ``int8`` (see :meth:`_quantize.quantize`)
+
+    Returns:
+        str: the path of the converted model
+
+    .. code:: python
+
+        >>> from lexicons_builder.nlp_model_explorer.explorer import convert_model
+        >>> convert_model("~/models/frWac.bin")
+        '~/models/frWac.kv'
+
+    """
+    if out_path is None:
+        suffix = f".{dtype}" if dtype else ""
+        out_path = os.path.splitext(model_path)[0] + suffix + NATIVE_EXTENSION
+    if os.path.abspath(out_path) == os.path.abspath(model_path):
+        raise ValueError(f"'{model_path}' is already in the native format")
+    model = _load_model(model_path)
+    if dtype:
+        model = _quantize.quantize_model(model, dtype)
+    else:
+        model.fill_norms()
+    # sep_limit=0: all the arrays are stored in separate files
+    model.save(out_path, sep_limit=0)
+    logging.info(f"'{model_path}' converted to '{out_path}'")
+    return out_path
+
+
+def get_model(model_path: str, limit=None, min_count=None, allow=None):
+    """return the model, loading it only if it is not already in memory
+    (with the same words kept, see :meth:`_load_model`)"""
+    return model_cache.get(model_path, _load_model, limit, min_count, allow)
+
+
+def _load_ann_index(model_path: str, options=(), n_lists: int = None):
+    """Load the index of the model (memory mapped), building and saving
+    it first if it does not exist or is older than the model"""
+    # the default number of clusters keeps the path of the previous indexes
+    path_options = options if n_lists is None else tuple(options) + (n_lists,)
+    path = _ann.index_path(model_path, *path_options)
+    model = get_model(model_path, *options)
+    meta_path = os.path.join(path, "meta.json")
+    model_mtime = os.path.getmtime(os.path.expanduser(model_path))
+    if not os.path.exists(meta_path) or os.path.getmtime(meta_path) < model_mtime:
+        _ann.IVFIndex.build(model, n_lists=n_lists).save(path)
+    index = _ann.IVFIndex.load(path)
+    if index.meta.get("n_words") != len(model.index_to_key):
+        raise ValueError(f"the index '{path}' does not match the model '{model_path}'")
+    return index
+
+
+def get_ann_index(
+    model_path: str, limit=None, min_count=None, allow=None, n_lists: int = None
+):
+    """return the approximate nearest neighbour index of the model
+    (see :obj:`_ann.IVFIndex`). It is built the first time and saved
+    next to the model (``<model>.ivf``, one index per set of words kept
+    and number of clusters), then loaded once per process
+
+    .. code:: python
+
+        >>> from lexicons_builder.nlp_model_explorer.explorer import get_ann_index
+        >>> index = get_ann_index("~/models/frWac.bin")  # ~/models/frWac.bin.ivf
+
+    """
+    path = os.path.abspath(os.path.expanduser(model_path))
+    key = (path, os.path.getmtime(path), limit, min_count, allow, n_lists)
+    with _ann_indexes_lock:
+        if key not in _ann_indexes:
+            # the indexes of a previous version of the model
+            for old_key in [k for k in _ann_indexes if k[0] == path and k[1] != key[1]]:
+                logging.info(f"'{model_path}' changed, unloading its previous index")
+                del _ann_indexes[old_key]
+            _ann_indexes[key] = _load_ann_index(
+                model_path, (limit, min_count, allow), n_lists
+            )
+        return _ann_indexes[key]
+
+
+def get_neighbour_cache(path: str) -> NeighbourCache:
+    """return the persistent cache of neighbours stored in the file
+    (see :obj:`_neighbour_cache.NeighbourCache`), opened once per process"""
+    path = os.path.abspath(os.path.expanduser(path))
+    with _neighbour_caches_lock:
+        if path not in _neighbour_caches:
+            _neighbour_caches[path] = NeighbourCache(path)
+        return _neighbour_caches[path]
+
+
+def _most_similar(
+    model,
+    words: list,
+    model_path: str,
+    options=(),
+    n_probe=None,
+    neighbour_cache=None,
+    topn: int = 10,
+) -> dict:
+    """return the neighbours of the words, searched in the approximate index
+    of the model if ``n_probe`` is given, else in the neighbour cache and
+    in the whole vocabulary"""
+    if n_probe:
+        index = get_ann_index(model_path, *options)
+        return index.most_similar(model, words, topn, n_probe)
+    if not neighbour_cache:
+        return most_similar_batch(model, words, topn)
+    cache = get_neighbour_cache(neighbour_cache)
+    neighbours = cache.get(model, words, topn)
+    missing = [word for word in words if word not in neighbours]
+    if missing:
+        found = most_similar_batch(model, missing, topn)
+        cache.add(model, topn, found)
+        neighbours.update(found)
+    return neighbours
+
+
+def precompute_neighbours(
+    model_path: str,
+    cache_path: str,
+    n_words: int,
+    topn: int = 10,
+    limit: int = None,
+    min_count: int = None,
+    allow: str = None,
+) -> int:
+    """compute the neighbours of the ``n_words`` most frequent words of the
+    model and store them in the neighbour cache
+
+    Args:
+        model_path (str): the path of the model
+        cache_path (str): the path of the neighbour cache
+        n_words (int): the number of words
+        topn (int, optional): the number of neighbours of each word
+        limit, min_count, allow (optional): the words of the model loaded (see :meth:`_load_model`)
+
+    Returns:
+        int: the number of words added to the cache
+
+    .. code:: python
+
+        >>> from lexicons_builder.nlp_model_explorer.explorer import precompute_neighbours
+        >>> precompute_neighbours("~/models/frWac.kv", "~/models/neighbours.sqlite", 200000)
+        200000
+
+    """
+    model = get_model(model_path, limit, min_count, allow)
+    cache = get_neighbour_cache(cache_path)
+    return precompute(cache, model, most_similar_batch, n_words, topn)
+
+
+def preload(*model_paths: str):
+    """load the models in memory before exploring them
+
+    .. code:: python
+
+        >>> from lexicons_builder.nlp_model_explorer.explorer import preload, unload
+        >>> preload("~/models/frWac.bin", "~/models/nlwiki.txt")
+        >>> ...
+        >>> unload("~/models/nlwiki.txt")
+
+    """
+    for model_path in model_paths:
+        logging.info(f"loading nlp model from '{model_path}'")
+        get_model(model_path)
+
+
+def unload(model_path: str = None):
+    """free the memory used by the model (by all the models if no path is given)"""
+    model_cache.unload(model_path)
+    with _ann_indexes_lock:
+        if model_path is None:
+            _ann_indexes.clear()
+            return
+        path = os.path.abspath(os.path.expanduser(model_path))
+        for key in [k for k in _ann_indexes if k[0] == path]:
+            del _ann_indexes[key]
+
+
+def share_model(model_path: str, name: str = None, directory: str = None) -> str:
+    """load the model once and write its vectors and its vocabulary in
+    memory mapped files (in ``/dev/shm`` by default), that the processes of
+    the host attach to by name (see :meth:`attach_model`)
+
+    Args:
+        model_path (str): the path of the model
+        name (str, optional): the name of the shared model. By default it depends on the path and the modification time of the model
+        directory (str, optional): where the files are written
+
+    Returns:
+        str: the name of the shared model
+
+    .. code:: python
+
+        >>> from multiprocessing import Pool
+        >>> from lexicons_builder.nlp_model_explorer.explorer import (
+        ...     attach_model, explore_nlp_model_by_level, share_model, unshare_model
+        ... )
+        >>> name = share_model("~/models/frWac.bin")
+        >>> with Pool(8, initializer=attach_model, initargs=(name,)) as pool:
+        ...     graphs = pool.starmap(
+        ...         explore_nlp_model_by_level,
+        ...         [(word, "~/models/frWac.bin", 2) for word in words],
+        ...     )
+        >>> unshare_model(name)
+
+    """
+    path = os.path.abspath(os.path.expanduser(model_path))
+    if name is None:
+        version = f"{path} {os.path.getmtime(path)}"
+        name = hashlib.sha1(version.encode()).hexdigest()[:16]
+    if not os.path.isdir(_shared.shared_path(name, directory)):
+        logging.info(f"sharing the model '{model_path}' as '{name}'")
+        _shared.share(get_model(model_path), path, name, directory)
+    return name
+
+
+def attach_model(name: str, directory: str = None):
+    """attach the process to the shared model (see :meth:`share_model`),
+    the explorations of its model path then use the shared memory"""
+    model = _shared.SharedKeyedVectors(_shared.shared_path(name, directory))
+    # the model is used by get_model(model_path) (without limit, min_count, allow)
+    model_cache.add(model.model_path, model, None, None, None)
+    return model
+
+
+def unshare_model(name: str, directory: str = None):
+    """delete the files of the shared model"""
+    _shared.unshare(name, directory)
+
+
+def _threshold(
+    similarity: float = None, min_similarity: float = None, decay: float = None
+):
+    """return the minimum similarity of the neighbours of a word: ``min_similarity``
+    and ``(1 - decay) * similarity``, where ``similarity`` is the similarity of the
+    word with the word it was found from (None for the root word).
+    None if there is no minimum"""
+    if decay is not None and not 0 <= decay <= 1:
+        raise ValueError("decay must be between 0 and 1")
+    thresholds = [min_similarity]
+    if decay is not None and similarity is not None:
+        thresholds.append((1 - decay) * similarity)
+    thresholds = [t for t in thresholds if t is not None]
+    return max(thresholds) if thresholds else None
+
+
+def _kept(neighbours: list, threshold: float = None) -> list:
+    """return the neighbours at least as similar as the threshold"""
+    if threshold is None:
+        return neighbours
+    # the neighbours are sorted from the most similar
+    return [(w, sim) for w, sim in neighbours if sim >= threshold]
+
+
+def _reachable(
+    word: str,
+    neighbours: dict,
+    max_depth: int,
+    min_similarity: float = None,
+    decay: float = None,
+) -> dict:
+    """return the words found from the word with the neighbours already
+    computed, at a depth lower than max_depth, with the lowest depth and the
+    lowest similarity they are found with (the loosest thresholds)"""
+    found = {word: (0, None)}
+    changed = [word]
+    while changed:
+        next_changed = []
+        for w in changed:
+            depth, similarity = found[w]
+            if depth + 1 >= max_depth or w not in neighbours:
+                continue
+            threshold = _threshold(similarity, min_similarity, decay)
+            for new_word, new_similarity in _kept(neighbours[w], threshold):
+                if new_word == word:
+                    continue
+                previous = found.get(new_word)
+                if previous is not None:
+                    new_similarity = min(previous[1], new_similarity)
+                    current = (min(previous[0], depth + 1), new_similarity)
+                else:
+                    current = (depth + 1, new_similarity)
+                if current != previous:
+                    found[new_word] = current
+                    next_changed.append(new_word)
+        changed = next_changed
+    return found
 
 
 def explore_nlp_model(
@@ -72,6 +492,15 @@ def explore_nlp_model(
     current_depth=1,
     _previous_graph=None,
     _previous_model=None,
+    n_probe: int = None,
+    limit: int = None,
+    min_count: int = None,
+    allow: str = None,
+    neighbour_cache: str = None,
+    topn: int = 10,
+    min_similarity: float = None,
+    decay: float = None,
+    _similarity=None,
 ):
     """Explore the model reccursively and return a rdf graph
     containing the neighbour words.
@@ -80,6 +509,14 @@ def explore_nlp_model(
         word (str): the word
         model_path (str): the path of the nlp model
         current_depth (int): the depth of the reccursion
+        n_probe (int, optional): search the neighbours in the approximate index of the model, scanning ``n_probe`` clusters (see :meth:`get_ann_index`). By default the search is exact
+        limit (int, optional): only load the ``limit`` most frequent words of the model
+        min_count (int, optional): only load the words seen at least ``min_count`` times (fastText and gensim models)
+        allow (str, optional): only load the words matching this regular expression
+        neighbour_cache (str, optional): the path of the persistent cache of the neighbours (see :meth:`get_neighbour_cache`)
+        topn (int, optional): the number of neighbours of each word
+        min_similarity (float, optional): the neighbours less similar to the word are not added (nor explored)
+        decay (float, optional): the relative decay of the similarity (between 0 and 1): the neighbours of a word are at least ``(1 - decay)`` times as similar as the word was to the word it was found from
 
     Returns:
         a :obj:`Graph` object containing the terms
@@ -127,20 +564,37 @@ def explore_nlp_model(
         return graph
 
     if not _previous_model:
-        logging.info(f"loading nlp model from '{model_path}'")
-        # to avoid reading the file each time the function is invoked
-        _previous_model = _load_model(model_path)
+        # the model is only read from the file the first time
+        _previous_model = get_model(model_path, limit, min_count, allow)
 
     if word not in _previous_model:
         # the model does not contain the original word
         return graph
 
-    for new_word in [w[0] for w in _previous_model.most_similar(word)]:
+    threshold = _threshold(_similarity, min_similarity, decay)
+    neighbours = _most_similar(
+        _previous_model,
+        [word],
+        model_path,
+        (limit, min_count, allow),
+        n_probe,
+        neighbour_cache,
+        topn,
+    )[word]
+
+    for new_word, similarity in _kept(neighbours, threshold):
         # add_word(self, word, depth, relation, target_word, synset_uri=None):
         if graph.word_in_graph(new_word):
             continue
         assert new_word != word
-        graph.add_word(new_word, current_depth, "synonym", word, comesFrom=model_path)
+        graph.add_word(
+            new_word,
+            current_depth,
+            "synonym",
+            word,
+            comesFrom=model_path,
+            similarity=similarity,
+        )
         graph = explore_nlp_model(
             new_word,
             model_path,
@@ -148,11 +602,118 @@ def explore_nlp_model(
             max_depth=max_depth,
             _previous_graph=graph,
             _previous_model=_previous_model,
+            n_probe=n_probe,
+            limit=limit,
+            min_count=min_count,
+            allow=allow,
+            neighbour_cache=neighbour_cache,
+            topn=topn,
+            min_similarity=min_similarity,
+            decay=decay,
+            _similarity=similarity,
         )
 
     return graph
 
 
+def explore_nlp_model_by_level(
+    word: str,
+    model_path: str,
+    max_depth: int = 5,
+    n_probe: int = None,
+    limit: int = None,
+    min_count: int = None,
+    allow: str = None,
+    neighbour_cache: str = None,
+    topn: int = 10,
+    min_similarity: float = None,
+    decay: float = None,
+):
+    """Explore the model level by level and return the same rdf graph as
+    :meth:`explore_nlp_model`.
+
+    The neighbours of all the words of a depth (the frontier) are computed
+    at once (see :meth:`_search.most_similar_batch`), then the graph is
+    built in the order of :meth:`explore_nlp_model`.
+
+    Args:
+        word (str): the word
+        model_path (str): the path of the nlp model
+        max_depth (int, optional): the maximum depth of the exploration
+        n_probe (int, optional): search the neighbours in the approximate index of the model, scanning ``n_probe`` clusters (see :meth:`get_ann_index`). By default the search is exact
+        limit (int, optional): only load the ``limit`` most frequent words of the model
+        min_count (int, optional): only load the words seen at least ``min_count`` times (fastText and gensim models)
+        allow (str, optional): only load the words matching this regular expression
+        neighbour_cache (str, optional): the path of the persistent cache of the neighbours (see :meth:`get_neighbour_cache`)
+        topn (int, optional): the number of neighbours of each word
+        min_similarity (float, optional): the neighbours less similar to the word are not added (nor explored)
+        decay (float, optional): the relative decay of the similarity (between 0 and 1): the neighbours of a word are at least ``(1 - decay)`` times as similar as the word was to the word it was found from
+
+    Returns:
+        a :obj:`Graph` object containing the terms
+
+    .. code:: python
+
+        >>> from lexicons_builder.nlp_model_explorer.explorer import explore_nlp_model_by_level
+        >>> g = explore_nlp_model_by_level('test', '<path/to/model>', 2)
+
+    """
+    _threshold(None, min_similarity, decay)
+    graph = Graph()
+    graph.add_root_word(word)
+    model = get_model(model_path, limit, min_count, allow)
+    if word not in model:
+        # the model does not contain the original word
+        return graph
+
+    # the words found at a depth lower than max_depth are explored
+    # (a word can be found deeper, or from a less similar word, by the depth
+    # first exploration: the words are explored with their lowest depth and
+    # similarity, so a neighbour pruned here is also pruned by the depth
+    # first exploration)
+    neighbours = {}
+    frontier = [word] if max_depth > 0 else []
+    while frontier:
+        logging.debug(f"Exploring {len(frontier)} words")
+        neighbours.update(
+            _most_similar(
+                model,
+                frontier,
+                model_path,
+                (limit, min_count, allow),
+                n_probe,
+                neighbour_cache,
+                topn,
+            )
+        )
+        found = _reachable(word, neighbours, max_depth, min_similarity, decay)
+        frontier = [w for w in found if w not in neighbours]
+
+    # same order as the depth first exploration
+    in_graph = {word}
+
+    def _add_neighbours(word, current_depth, similarity=None):
+        threshold = _threshold(similarity, min_similarity, decay)
+        for new_word, new_similarity in _kept(neighbours[word], threshold):
+            if new_word in in_graph:
+                continue
+            in_graph.add(new_word)
+            graph.add_word(
+                new_word,
+                current_depth,
+                "synonym",
+                word,
+                comesFrom=model_path,
+                similarity=new_similarity,
+            )
+            if current_depth < max_depth:
+                _add_neighbours(new_word, current_depth + 1, new_similarity)
+
+    if max_depth > 0:
+        _add_neighbours(word, 1)
+    return graph
+
+
 if __name__ == "__main__":
     g = explore_nlp_model(
         "lire",
@@ -0,0 +1,242 @@
+"""
+Caches used by the scrappers to avoid downloading the same pages again.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+__author__ = "GLNB"
+__copyright__ = "GLNB"
+__license__ = "mit"
+
+
+class NegativeCache:
+    """Remember the pages that have no synonyms (404 or empty page)
+    so they are not downloaded again before ``ttl`` seconds.
+
+    If a path is given, the entries are appended to this file (one json
+    object per line) and loaded back when the cache is created, so the
+    known misses are kept from one run to another.
+
+    Args:
+        ttl (float): the number of seconds an entry is kept
+        path (str, optional): the file where the entries are stored
+
+    .. code:: python
+
+        >>> from lexicons_builder.scrappers.scrappers import SynonymsGetter, NegativeCache
+        >>> # shared by all the scrappers
+        >>> SynonymsGetter.negative_cache = NegativeCache(ttl=3600, path="misses.jsonl")
+        >>> ...
+        >>> SynonymsGetter.negative_cache.stats()
+        {'entries': 120, 'hits': 43, 'bytes_saved': 1203456}
+
+    """
+
+    def __init__(self, ttl: float = 7 * 24 * 3600, path: str = None):
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.bytes_saved = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # the last line might be truncated
+                    continue
+                self._entries[entry["url"]] = (entry["expires"], entry["size"])
+        logging.info(f"{len(self._entries)} entries loaded from '{self.path}'")
+
+    def __contains__(self, url: str) -> bool:
+        """return :obj:`True` if the page is a known miss. Count the hit"""
+        with self._lock:
+            if url not in self._entries:
+                return False
+            expires, size = self._entries[url]
+            if expires < time.time():
+                del self._entries[url]
+                return False
+            self.hits += 1
+            self.bytes_saved += size
+            return True
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, url: str, size: int = 0):
+        """add the page to the known misses
+
+        Args:
+            url (str): the url of the page
+            size (int, optional): the size of the response, used to count the bytes saved
+        """
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._entries[url] = (expires, size)
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    print(
+                        json.dumps({"url": url, "expires": expires, "size": size}),
+                        file=f,
+                    )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+
+    def stats(self) -> dict:
+        """return the number of entries, of hits and the bytes saved"""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "bytes_saved": self.bytes_saved,
+        }
+
+
+class PageCache:
+    """Remember the synonyms found on the pages with their validators
+    (``ETag`` and ``Last-Modified`` headers)
+
+    A page is not downloaded again before ``ttl`` seconds. After that, the
+    request is sent with ``If-None-Match`` / ``If-Modified-Since`` and a
+    ``304 Not Modified`` response only refreshes the entry, so a page that
+    did not change is not downloaded again.
+
+    If a path is given, the entries are appended to this file (one json
+    object per line) and loaded back when the cache is created.
+
+    Args:
+        ttl (float): the number of seconds an entry is used without revalidation
+        path (str, optional): the file where the entries are stored
+
+    .. code:: python
+
+        >>> from lexicons_builder.scrappers.scrappers import SynonymsGetter, PageCache
+        >>> # shared by all the scrappers
+        >>> SynonymsGetter.page_cache = PageCache(ttl=24 * 3600, path="pages.jsonl")
+        >>> ...
+        >>> SynonymsGetter.page_cache.stats()
+        {'entries': 1520, 'hits': 12, 'revalidated': 1490}
+
+    """
+
+    def __init__(self, ttl: float = 24 * 3600, path: str = None):
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.revalidated = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        lines = 0
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # the last line might be truncated
+                    continue
+                lines += 1
+                self._entries[entry.pop("url")] = entry
+        logging.info(f"{len(self._entries)} pages loaded from '{self.path}'")
+        if lines > 2 * len(self._entries):
+            # most of the lines are previous versions of the entries
+            self._rewrite()
+
+    def _rewrite(self):
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            for url, entry in self._entries.items():
+                print(json.dumps({"url": url, **entry}, ensure_ascii=False), file=f)
+        os.replace(self.path + ".tmp", self.path)
+
+    def _write(self, url, entry):
+        # called with the lock held
+        self._entries[url] = entry
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                print(json.dumps({"url": url, **entry}, ensure_ascii=False), file=f)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, url: str) -> dict:
+        """return the entry of the page (even if it expired) or :obj:`None`.
+        The entry contains the ``words``, the validators ``etag`` and
+        ``last_modified`` and the date it ``expires``"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None and self.is_fresh(entry):
+                self.hits += 1
+            return entry
+
+    @staticmethod
+    def is_fresh(entry: dict) -> bool:
+        return entry["expires"] >= time.time()
+
+    @staticmethod
+    def validators(entry: dict) -> dict:
+        """return the headers of the conditional request revalidating the entry"""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def add(self, url: str, words: list, etag: str = None, last_modified: str = None):
+        """add the words found on the page and its validators
+
+        Args:
+            url (str): the url of the page
+            words (list): the synonyms found on the page
+            etag (str, optional): the ``ETag`` header of the response
+            last_modified (str, optional): the ``Last-Modified`` header of the response
+        """
+        entry = {
+            "words": list(words),
+            "etag": etag,
+            "last_modified": last_modified,
+            "expires": time.time() + self.ttl,
+        }
+        with self._lock:
+            self._write(url, entry)
+
+    def refresh(self, url: str) -> dict:
+        """the page did not change (304): keep the entry for ``ttl`` seconds more"""
+        with self._lock:
+            entry = dict(self._entries[url], expires=time.time() + self.ttl)
+            self._write(url, entry)
+            self.revalidated += 1
+            return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.path and os.path.exists(self.path):
+                os.remove(self.path)
+
+    def stats(self) -> dict:
+        """return the number of entries, of hits and of pages revalidated"""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+        }
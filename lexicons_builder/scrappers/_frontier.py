@@ -0,0 +1,112 @@
+"""
+Best-first crawl frontier and crawl budget used by the scrappers.
+
+Instead of expanding every word up to the maximum depth, the words are
+expanded by order of priority: the words reached from more parents (or from
+more websites) first, then the words closer to the root. The crawl stops
+when the budget (number of pages or number of seconds) is spent.
+"""
+
+import heapq
+import itertools
+import time
+
+__author__ = "GLNB"
+__copyright__ = "GLNB"
+__license__ = "mit"
+
+
+class BestFirstFrontier:
+    """Priority queue of the words to expand
+
+    The priority of a word is the number of distinct (parent, website)
+    pairs it was reached from. Ties are broken by depth, then by order
+    of discovery.
+
+    .. code:: python
+
+        >>> frontier = BestFirstFrontier()
+        >>> frontier.push("bouquin", 1, "livre")
+        >>> frontier.push("ouvrage", 1, "livre")
+        >>> frontier.push("ouvrage", 2, "bouquin")
+        >>> frontier.pop()
+        ('ouvrage', 1)
+
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        # word -> [depth, set of (parent, website)]
+        self._queued = {}
+        self._popped = set()
+
+    def __len__(self):
+        return len(self._queued)
+
+    def __contains__(self, word):
+        return word in self._queued
+
+    def push(self, word: str, depth: int, parent: str = None, website: str = None):
+        """add the word to the frontier, or increase its priority if it is
+        already in it. Words that were already expanded are ignored"""
+        if word in self._popped:
+            return
+        if word in self._queued:
+            entry = self._queued[word]
+            entry[0] = min(entry[0], depth)
+        else:
+            entry = self._queued[word] = [depth, set()]
+        if parent is not None:
+            entry[1].add((parent, website))
+        heapq.heappush(
+            self._heap, (-len(entry[1]), entry[0], next(self._counter), word)
+        )
+
+    def pop(self):
+        """return the (word, depth) with the highest priority"""
+        while self._heap:
+            score, depth, _, word = heapq.heappop(self._heap)
+            entry = self._queued.get(word)
+            if entry is None or (-score, depth) != (len(entry[1]), entry[0]):
+                # outdated entry, the word was pushed again with another priority
+                continue
+            del self._queued[word]
+            self._popped.add(word)
+            return word, depth
+        raise IndexError("pop from an empty frontier")
+
+    def pop_many(self, n: int) -> list:
+        """return the (up to) n (word, depth) with the highest priority"""
+        return [self.pop() for _ in range(min(n, len(self)))]
+
+
+class CrawlBudget:
+    """Number of pages and/or number of seconds a crawl can spend
+
+    Args:
+        max_pages (int, optional): the maximum number of pages looked up
+        max_seconds (float, optional): the maximum duration of the crawl
+    """
+
+    def __init__(self, max_pages: int = None, max_seconds: float = None):
+        self.max_pages = max_pages
+        self.max_seconds = max_seconds
+        self.pages = 0
+        self._start = time.monotonic()
+
+    def spend(self, pages: int = 1):
+        self.pages += pages
+
+    @property
+    def remaining_pages(self):
+        if self.max_pages is None:
+            return float("inf")
+        return max(0, self.max_pages - self.pages)
+
+    def exhausted(self) -> bool:
+        if not self.remaining_pages:
+            return True
+        if self.max_seconds is not None:
+            return time.monotonic() - self._start >= self.max_seconds
+        return False
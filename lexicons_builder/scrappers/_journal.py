@@ -0,0 +1,104 @@
+"""
+Write-ahead journal of the crawls, used to resume a crawl that stopped.
+
+Each page looked up on a website is appended to the journal (one json object
+per line) with its url and the words found on it, before these words are added to the
+graph. Replaying the journal gives back the visited pages and the edges
+discovered so far; the crawl then goes through the same words in the same
+order and only downloads the pages that are not in the journal yet.
+"""
+
+import json
+import logging
+import os
+import threading
+
+__author__ = "GLNB"
+__copyright__ = "GLNB"
+__license__ = "mit"
+
+
+class CrawlJournal:
+    """Append-only journal of the pages looked up during a crawl
+
+    Args:
+        path (str): the path of the journal. If the file exists, its entries are loaded
+        sync (bool, optional): call :obj:`os.fsync` after each entry (slower but safer)
+
+    .. code:: python
+
+        >>> journal = CrawlJournal("crawl.jsonl")
+        >>> url = "https://crisco2.unicaen.fr/des/synonymes/livre"
+        >>> journal.get(url)
+        >>> journal.record(url, ["bouquin", "ouvrage"])
+        >>> journal.get(url)
+        ['bouquin', 'ouvrage']
+
+    """
+
+    def __init__(self, path: str, sync: bool = False):
+        self.path = path
+        self.sync = sync
+        self._entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self._replay()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _replay(self):
+        # end of the last entry read
+        end = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # the crawl stopped while writing this line
+                    # (possibly in the middle of a utf-8 character)
+                    logging.warning(f"skipping truncated line in '{self.path}'")
+                    continue
+                self._entries[entry["url"]] = entry["results"]
+                end = f.tell()
+        # the new entries are appended after the last complete line,
+        # not glued to the truncated one
+        with open(self.path, "r+b") as f:
+            f.truncate(end)
+            if end:
+                f.seek(end - 1)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+        logging.info(f"{len(self._entries)} pages replayed from '{self.path}'")
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, url: str):
+        """return the words found on the page,
+        or :obj:`None` if the page is not in the journal"""
+        return self._entries.get(url)
+
+    def record(self, url: str, results: list):
+        """append the words found on the page to the journal
+
+        The pages are keyed by their url: the scrappers of several
+        languages of the same website (eg: reverso) do not share entries
+        """
+        results = list(results)
+        line = json.dumps({"url": url, "results": results}, ensure_ascii=False)
+        with self._lock:
+            self._entries[url] = results
+            print(line, file=self._file, flush=True)
+            if self.sync:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,230 @@
+"""
+Metrics of the scrappers (requests, latency, parsing, caches), per website.
+
+The metrics are shared by all the scrappers (see ``SynonymsGetter.metrics``).
+They can be read at the end of a crawl with :meth:`CrawlMetrics.summary`,
+or followed during the crawl with a callback::
+
+    >>> from lexicons_builder.scrappers.scrappers import SynonymsGetter
+    >>> SynonymsGetter.metrics.add_callback(
+    ...     lambda website, name, value: statsd.timing(f"{website}.{name}", value)
+    ... )
+"""
+
+import bisect
+import json
+import logging
+import threading
+from collections import Counter, defaultdict
+
+__author__ = "GLNB"
+__copyright__ = "GLNB"
+__license__ = "mit"
+
+
+# upper bounds of the buckets of the histograms
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+PARSE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+BYTES_BUCKETS = (1e3, 5e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6)
+WORDS_BUCKETS = (0, 1, 5, 10, 20, 50, 100, 200)
+
+
+class Histogram:
+    """Distribution of the values observed, counted in fixed buckets
+
+    Args:
+        bounds (tuple): the upper bounds of the buckets (sorted)
+
+    .. code:: python
+
+        >>> h = Histogram((1, 2, 5))
+        >>> for v in (0.5, 1.5, 1.8, 10):
+        ...     h.observe(v)
+        >>> h.to_dict()["buckets"]
+        {'1': 1, '2': 2, '5': 0, '+inf': 1}
+
+    """
+
+    def __init__(self, bounds: tuple):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """estimate of the quantile q (the upper bound of its bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        labels = [f"{b:g}" for b in self.bounds] + ["+inf"]
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class _WebsiteMetrics:
+    def __init__(self):
+        self.status_codes = Counter()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.parse_time = Histogram(PARSE_BUCKETS)
+        self.response_bytes = Histogram(BYTES_BUCKETS)
+        self.words_per_page = Histogram(WORDS_BUCKETS)
+
+    def to_dict(self) -> dict:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "requests": self.latency.count,
+            "status_codes": {str(k): v for k, v in sorted(self.status_codes.items())},
+            "bytes": int(self.response_bytes.sum),
+            "pages": self.words_per_page.count,
+            "words": int(self.words_per_page.sum),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_ratio": self.cache_hits / lookups if lookups else None,
+            "latency": self.latency.to_dict(),
+            "parse_time": self.parse_time.to_dict(),
+            "response_bytes": self.response_bytes.to_dict(),
+            "words_per_page": self.words_per_page.to_dict(),
+        }
+
+
+class CrawlMetrics:
+    """Counters and histograms of the scrappers, per website
+
+    * ``latency``: the duration of each request (seconds)
+    * ``parse_time``: the duration of the extraction of the words of a page (seconds)
+    * ``response_bytes``: the size of each response
+    * ``status_codes``: the number of responses per status code
+    * ``cache``: the lookups of the caches (hit or miss)
+    * ``words_per_page``: the number of words found on each page
+
+    Every observation is also given to the callbacks as
+    ``callback(website, name, value)``.
+
+    .. code:: python
+
+        >>> metrics = CrawlMetrics()
+        >>> metrics.record_request("crisco2.unicaen.fr", 0.3, 200, 25400)
+        >>> metrics.summary()["crisco2.unicaen.fr"]["requests"]
+        1
+
+    """
+
+    def __init__(self):
+        self._websites = defaultdict(_WebsiteMetrics)
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def add_callback(self, callback):
+        """call ``callback(website, name, value)`` on each observation"""
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        self._callbacks.remove(callback)
+
+    def _notify(self, website, *observations):
+        for callback in self._callbacks:
+            for name, value in observations:
+                try:
+                    callback(website, name, value)
+                except Exception as e:
+                    # the metrics should never stop the crawl
+                    logging.error(f"metrics callback failed: {e}")
+
+    def record_request(self, website: str, latency: float, status: int, size: int):
+        """record a response of the website
+
+        Args:
+            website (str): the website
+            latency (float): the duration of the request (seconds)
+            status (int): the status code of the response
+            size (int): the number of bytes of the response
+        """
+        with self._lock:
+            metrics = self._websites[website]
+            metrics.latency.observe(latency)
+            metrics.status_codes[status] += 1
+            metrics.response_bytes.observe(size)
+        self._notify(website, ("latency", latency), ("status", status), ("bytes", size))
+
+    def record_page(self, website: str, parse_time: float, n_words: int):
+        """record the extraction of the words of a page
+
+        Args:
+            website (str): the website
+            parse_time (float): the duration of the extraction (seconds)
+            n_words (int): the number of words found
+        """
+        with self._lock:
+            metrics = self._websites[website]
+            metrics.parse_time.observe(parse_time)
+            metrics.words_per_page.observe(n_words)
+        self._notify(website, ("parse_time", parse_time), ("words", n_words))
+
+    def record_cache(self, website: str, hit: bool):
+        """record a lookup of a cache of the scrappers"""
+        with self._lock:
+            metrics = self._websites[website]
+            if hit:
+                metrics.cache_hits += 1
+            else:
+                metrics.cache_misses += 1
+        self._notify(website, ("cache_hit", hit))
+
+    def reset(self):
+        with self._lock:
+            self._websites.clear()
+
+    def summary(self) -> dict:
+        """return the metrics of each website"""
+        with self._lock:
+            return {
+                website: metrics.to_dict()
+                for website, metrics in sorted(self._websites.items())
+            }
+
+    def to_json(self, path: str = None) -> str:
+        """return the summary in json, and write it to the file if a path is given"""
+        summary = json.dumps(self.summary(), indent=2)
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(summary)
+        return summary
+
+    def bottleneck(self) -> str:
+        """return the website where the crawl spent the most time"""
+        summary = self.summary()
+        if not summary:
+            return None
+        return max(
+            summary,
+            key=lambda w: summary[w]["latency"]["sum"]
+            + summary[w]["parse_time"]["sum"],
+        )
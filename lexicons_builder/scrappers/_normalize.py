@@ -0,0 +1,101 @@
+"""
+Normalization of the words found by the scrappers.
+
+The words go through the pipeline of their language (compiled regular
+expressions of the language, then the default ones, then lowercase and
+optionally unidecode) before being added
+to the graph. The same surface forms come back on many pages, so the
+results are kept in a bounded LRU cache.
+"""
+
+import re
+import threading
+from functools import lru_cache
+
+from unidecode import unidecode
+
+__author__ = "GLNB"
+__copyright__ = "GLNB"
+__license__ = "mit"
+
+
+# (pattern, replacement) applied to the words of all the languages
+DEFAULT_RULES = [(r"\s+", " ")]
+
+# tags and annotations added to the words by some dictionaries.
+# Only the languages listing them in LANGUAGE_RULES remove them
+BRACKET_RULES = [
+    # tags, eg: sníst <čeho>
+    (r"<.*?>", ""),
+    # annotations, eg: sníst (hodně)
+    (r"\(.*?\)", ""),
+]
+
+# (pattern, replacement) applied before the default rules
+LANGUAGE_RULES = {
+    "cs": list(BRACKET_RULES),
+    # the stress marks of the russian dictionaries
+    "ru": [("\u0301", "")],
+}
+
+_normalizers = {}
+_lock = threading.Lock()
+
+
+class Normalizer:
+    """Pipeline normalizing the words of a language
+
+    Args:
+        rules (list): the (pattern, replacement) applied to the word, in order
+        unidecode_word (bool, optional): convert the word to ASCII
+        maxsize (int, optional): the number of words kept in the LRU cache
+
+    .. code:: python
+
+        >>> normalize = Normalizer(BRACKET_RULES + DEFAULT_RULES)
+        >>> normalize("  Sníst  (hodně) ")
+        'snist'
+        >>> normalize("Œuvre")
+        'oeuvre'
+        >>> normalize.cache_info()
+        CacheInfo(hits=0, misses=2, maxsize=65536, currsize=2)
+
+    """
+
+    def __init__(self, rules: list, unidecode_word: bool = True, maxsize: int = 2**16):
+        self.rules = [(re.compile(pattern), repl) for pattern, repl in rules]
+        self.unidecode_word = unidecode_word
+        self._cached = lru_cache(maxsize=maxsize)(self._normalize)
+
+    def _normalize(self, word: str) -> str:
+        for pattern, repl in self.rules:
+            word = pattern.sub(repl, word)
+        word = word.strip().lower()
+        if self.unidecode_word:
+            word = unidecode(word)
+        return word
+
+    def __call__(self, word: str) -> str:
+        return self._cached(word)
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+
+def get_normalizer(lang: str = None, unidecode_word: bool = True) -> Normalizer:
+    """return the normalizer of the language, shared by all its scrappers"""
+    with _lock:
+        key = (lang, unidecode_word)
+        if key not in _normalizers:
+            rules = LANGUAGE_RULES.get(lang, []) + DEFAULT_RULES
+            _normalizers[key] = Normalizer(rules, unidecode_word)
+        return _normalizers[key]
+
+
+def register_rules(lang: str, rules: list):
+    """add (pattern, replacement) rules to the pipeline of the language"""
+    with _lock:
+        LANGUAGE_RULES.setdefault(lang, []).extend(rules)
+        # the normalizers of the language are created again with the new rules
+        for key in [k for k in _normalizers if k[0] == lang]:
+            del _normalizers[key]
@@ -0,0 +1,105 @@
+"""
+Process pool used to parse the html pages downloaded by the scrappers.
+
+Parsing with BeautifulSoup is CPU bound and holds the GIL, so the threads
+downloading the pages only send the html to the pool and go on with the
+next page. They get back a future of the list of synonyms extracted by the
+scrapper, which the crawl reads once the page is parsed.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+__author__ = "GLNB"
+__copyright__ = "GLNB"
+__license__ = "mit"
+
+
+def _extract_words(scrapper, html):
+    # runs in the worker processes
+    start = time.perf_counter()
+    words = scrapper.extract_words_from_html(html)
+    return words, time.perf_counter() - start
+
+
+def completed(result) -> Future:
+    """return a :obj:`concurrent.futures.Future` already done with the result"""
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def chain(future: Future, fn) -> Future:
+    """return a :obj:`concurrent.futures.Future` of ``fn(result)`` once the
+    future is done. ``fn`` runs in the thread completing the future"""
+    chained = Future()
+
+    def done(f):
+        try:
+            chained.set_result(fn(f.result()))
+        except BaseException as e:
+            chained.set_exception(e)
+
+    future.add_done_callback(done)
+    return chained
+
+
+class ParsingPool:
+    """Process pool that runs the extraction logic of the scrappers
+
+    At most ``max_pending`` pages can be waiting in the pool. Once the
+    limit is reached, :meth:`submit` blocks until a page has been parsed,
+    which slows down the threads downloading the pages.
+
+    Args:
+        max_workers (int, optional): the number of processes (default to the number of CPUs)
+        max_pending (int, optional): the maximum number of pages waiting to be parsed (default to twice the number of processes)
+
+    .. code:: python
+
+        >>> from lexicons_builder.scrappers.scrappers import ParsingPool, SynonymsGetterCrisco2
+        >>> scrapper = SynonymsGetterCrisco2()
+        >>> with ParsingPool(4) as pool:
+        ...     future = pool.submit(scrapper, html)
+        ...     # download the next pages meanwhile
+        ...     words, parse_time = future.result()
+        >>> words
+        ['bouquin', 'lire', ...]
+
+    """
+
+    def __init__(self, max_workers: int = None, max_pending: int = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.max_workers
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._pending = threading.BoundedSemaphore(self.max_pending)
+
+    def submit(self, scrapper, html: str):
+        """send the html page to the pool and return a
+        :obj:`concurrent.futures.Future` of the list of synonyms and of the
+        time spent parsing the page"""
+        self._pending.acquire()
+        try:
+            future = self._executor.submit(_extract_words, scrapper, html)
+        except Exception:
+            self._pending.release()
+            raise
+        future.add_done_callback(lambda _: self._pending.release())
+        return future
+
+    def extract_words(self, scrapper, html: str) -> list:
+        """parse the html page in the pool and return the list of synonyms"""
+        if not html:
+            return []
+        return self.submit(scrapper, html).result()[0]
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
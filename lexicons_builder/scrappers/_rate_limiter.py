@@ -0,0 +1,189 @@
+"""
+Per website rate limiting used by the scrappers.
+
+Each website gets a token bucket (the number of requests per second and the
+size of the burst can be configured) and a concurrency limit that is lowered
+when the website starts to answer with errors (429, 503, ...) and slowly
+raised again when the requests succeed.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+__author__ = "GLNB"
+__copyright__ = "GLNB"
+__license__ = "mit"
+
+
+# http status codes after which the request is sent again
+RETRY_STATUS_CODES = (429, 503)
+
+
+def parse_retry_after(value) -> float:
+    """return the number of seconds to wait given the value of a
+    ``Retry-After`` header (either a number of seconds or a http date).
+    Return :obj:`None` if the value cannot be parsed"""
+    if not value or not isinstance(value, str):
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
+
+
+class RateLimiter:
+    """Token bucket with an adaptive concurrency limit for one website
+
+    Args:
+        rate (float): the number of requests per second
+        burst (int): the maximum number of requests that can be sent at once
+        max_concurrency (int): the maximum number of requests in flight
+        error_threshold (float): the error rate above which the concurrency is halved
+        window (int): the number of latest requests used to compute the error rate
+        backoff_base (float): the base delay (in seconds) of the exponential backoff
+        backoff_max (float): the maximum delay (in seconds) between two attempts
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        burst: int = 1,
+        max_concurrency: int = 4,
+        error_threshold: float = 0.2,
+        window: int = 20,
+        backoff_base: float = 1.0,
+        backoff_max: float = 120.0,
+    ):
+        if rate <= 0:
+            raise ValueError(f"rate should be positive not '{rate}'")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = self.max_concurrency
+        self.error_threshold = error_threshold
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._in_flight = 0
+        self._outcomes = deque(maxlen=window)
+        self._condition = threading.Condition()
+
+    def _refill(self, now):
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._last_refill) * self.rate
+        )
+        self._last_refill = now
+
+    def acquire(self):
+        """block until a request can be sent to the website"""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self._in_flight >= self.concurrency:
+                    self._condition.wait()
+                    continue
+                wait = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+                if wait <= 0:
+                    self._tokens -= 1
+                    self._in_flight += 1
+                    return
+                self._condition.wait(wait)
+
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """context manager around :meth:`acquire` and :meth:`release`"""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record(self, error: bool):
+        """record the outcome of a request and adapt the concurrency
+
+        The concurrency is halved when the error rate goes above the
+        threshold and increased by one after a successful request
+        """
+        with self._condition:
+            self._outcomes.append(bool(error))
+            error_rate = sum(self._outcomes) / len(self._outcomes)
+            if error and error_rate > self.error_threshold:
+                if self.concurrency > 1:
+                    self.concurrency = max(1, self.concurrency // 2)
+                    logging.warning(
+                        f"error rate is {error_rate:.0%}, lowering the concurrency to {self.concurrency}"
+                    )
+            elif not error and self.concurrency < self.max_concurrency:
+                self.concurrency += 1
+            self._condition.notify_all()
+
+    def backoff(self, attempt: int, retry_after=None) -> float:
+        """return the delay before sending the request again and prevent
+        any other request to the website to be sent before the delay
+
+        The value of the ``Retry-After`` header is used if given, otherwise
+        an exponential backoff with full jitter is used
+
+        Args:
+            attempt (int): the number of attempts already made (starting at 0)
+            retry_after (str, optional): the ``Retry-After`` header of the response
+        """
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = random.uniform(
+                0, min(self.backoff_max, self.backoff_base * 2**attempt)
+            )
+        else:
+            delay = min(delay, self.backoff_max)
+        with self._condition:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+        return delay
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(website: str, **kwargs) -> RateLimiter:
+    """return the :obj:`RateLimiter` of the website, creating it with the
+    given keyword arguments the first time"""
+    with _limiters_lock:
+        if website not in _limiters:
+            _limiters[website] = RateLimiter(**kwargs)
+        return _limiters[website]
+
+
+def configure_rate_limiter(website: str, **kwargs) -> RateLimiter:
+    """replace the :obj:`RateLimiter` of the website
+
+    .. code:: python
+
+        >>> from lexicons_builder.scrappers.scrappers import configure_rate_limiter
+        >>> # 5 requests per second on crisco
+        >>> configure_rate_limiter("crisco2.unicaen.fr", rate=5, burst=5)
+
+    """
+    with _limiters_lock:
+        _limiters[website] = RateLimiter(**kwargs)
+        return _limiters[website]
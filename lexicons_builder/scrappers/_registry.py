@@ -0,0 +1,117 @@
+"""
+Registry of the scrappers of each language.
+
+The registry holds the classes of the scrappers and only creates the
+scrappers of a language the first time they are needed. Other packages can
+add scrappers through the ``lexicons_builder.scrappers`` entry point group,
+each entry point being a :obj:`SynonymsGetter` subclass with a ``lang``
+attribute::
+
+    # setup.py of another package
+    entry_points={
+        "lexicons_builder.scrappers": [
+            "my_website = my_package.scrapper:SynonymsGetterMyWebsite",
+        ]
+    }
+"""
+
+import logging
+import threading
+from collections.abc import Mapping
+
+try:
+    from importlib.metadata import entry_points
+except ImportError:  # python < 3.8
+    entry_points = None
+
+__author__ = "GLNB"
+__copyright__ = "GLNB"
+__license__ = "mit"
+
+
+ENTRY_POINT_GROUP = "lexicons_builder.scrappers"
+
+
+def _load_entry_points():
+    if entry_points is None:
+        return []
+    try:
+        eps = entry_points(group=ENTRY_POINT_GROUP)
+    except TypeError:  # python < 3.10
+        eps = entry_points().get(ENTRY_POINT_GROUP, [])
+    classes = []
+    for ep in eps:
+        try:
+            classes.append(ep.load())
+        except Exception as e:
+            logging.error(f"cannot load the scrapper '{ep.name}': {e}")
+    return classes
+
+
+class ScrapperRegistry(Mapping):
+    """Mapping language -> list of scrappers, created on first use
+
+    Args:
+        classes (dict): for each language, the list of the scrapper classes.
+            A scrapper that needs arguments is given as a tuple ``(class, *args)``
+
+    .. code:: python
+
+        >>> registry = ScrapperRegistry({"fr": [SynonymsGetterCrisco2, (SynonymsGetterReverso, "fr")]})
+        >>> "fr" in registry  # nothing is created
+        True
+        >>> [str(s) for s in registry["fr"]]  # the scrappers are created here
+        ['crawler of crisco2.unicaen.fr', 'crawler of synonyms.reverso.net']
+
+    """
+
+    def __init__(self, classes: dict):
+        self._factories = {lang: list(specs) for lang, specs in classes.items()}
+        self._instances = {}
+        self._entry_points_loaded = False
+        self._lock = threading.Lock()
+
+    def _load_entry_points(self):
+        # called with the lock held
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        for cls in _load_entry_points():
+            self._factories.setdefault(cls.lang, []).append(cls)
+            self._instances.pop(cls.lang, None)
+
+    def register(self, lang: str, cls, *args):
+        """add a scrapper class to the language. ``args`` are given to the
+        class when the scrapper is created"""
+        with self._lock:
+            self._factories.setdefault(lang, []).append((cls, *args))
+            # the scrappers of the language will be created again
+            self._instances.pop(lang, None)
+
+    def __getitem__(self, lang: str) -> list:
+        with self._lock:
+            self._load_entry_points()
+            if lang not in self._instances:
+                if lang not in self._factories:
+                    raise KeyError(lang)
+                instances = []
+                for spec in self._factories[lang]:
+                    cls, *args = spec if isinstance(spec, tuple) else (spec,)
+                    instances.append(cls(*args))
+                self._instances[lang] = instances
+            return self._instances[lang]
+
+    def __contains__(self, lang) -> bool:
+        with self._lock:
+            self._load_entry_points()
+            return lang in self._factories
+
+    def __iter__(self):
+        with self._lock:
+            self._load_entry_points()
+            return iter(list(self._factories))
+
+    def __len__(self):
+        with self._lock:
+            self._load_entry_points()
+            return len(self._factories)
@@ -0,0 +1,89 @@
+"""
+Coalescing of the concurrent requests of the same page.
+
+When several threads (or coroutines) ask for the same key at the same time,
+only the first one runs the function. The others wait for it and get the
+same result (or the same exception).
+"""
+
+import asyncio
+import functools
+import threading
+import weakref
+
+__author__ = "GLNB"
+__copyright__ = "GLNB"
+__license__ = "mit"
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Share the result of a function between concurrent callers with the same key
+
+    .. code:: python
+
+        >>> flight = SingleFlight()
+        >>> # called from several threads, download() runs only once at a time per url
+        >>> flight.do(url, download, url)
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        # one dict of asyncio futures per event loop
+        self._async_calls = weakref.WeakKeyDictionary()
+        # number of calls that did not run the function
+        self.shared = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """run ``fn(*args, **kwargs)`` unless a call with the same key is
+        already running, in which case wait for it and return its result"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key, fn, *args, **kwargs):
+        """asyncio version of :meth:`do`. The blocking function runs in the
+        default executor of the loop, and the coroutines (or threads)
+        asking for the same key at the same time share its result"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            futures = self._async_calls.setdefault(loop, {})
+        future = futures.get(key)
+        if future is None:
+            future = loop.run_in_executor(
+                None, functools.partial(self.do, key, fn, *args, **kwargs)
+            )
+            futures[key] = future
+            future.add_done_callback(lambda _: futures.pop(key, None))
+        else:
+            with self._lock:
+                self.shared += 1
+        # shield: a cancelled caller does not cancel the others
+        return await asyncio.shield(future)
@@ -2,7 +2,7 @@
 The scrappers package contains the scrappers that are used to retreive synonyms from the web.
 
 Each website has its own scrapper that inherit from the main :obj:`SynonymsGetter`
-class. The internal method `_get_results_from_website()` is the only method that is diffrent from each scrapper (since the html page of their website is different).
+class. The internal methods `_build_url()` and `_extract_words()` are the only methods that are diffrent from each scrapper (since the html page of their website is different).
 
 The :meth:`get_synonyms_from_scrappers` function agregate the results comming from all websites.
 
@@ -11,6 +11,7 @@ See the :doc:`List of dictionnaries section <../list_dictionaries>` for the list
 
 .. note::
     Some websites have locking mechanisms that prevent you from sending them huge amounts of requests. If you are blocked, you might have to wait some time.
+    The requests are rate limited per website (see :meth:`configure_rate_limiter`) and sent again when the website responds with a 429 or a 503.
 
 .. note::
     This method of scrapping the data should be updated regularly as the html code might change on the websites.
@@ -18,23 +19,92 @@ See the :doc:`List of dictionnaries section <../list_dictionaries>` for the list
 """
 
 
+import importlib.util
 import inspect
 import logging
 import re
 import requests
 import os
 import sys
+import time
 from concurrent.futures import ThreadPoolExecutor
 from random import choice
 from requests.utils import quote
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from unidecode import unidecode
 
+try:
+    from ._cache import NegativeCache, PageCache
+    from ._frontier import BestFirstFrontier, CrawlBudget
+    from ._journal import CrawlJournal
+    from ._metrics import CrawlMetrics
+    from ._normalize import get_normalizer, register_rules
+    from ._parsing import ParsingPool, chain, completed
+    from ._registry import ScrapperRegistry
+    from ._rate_limiter import (
+        RETRY_STATUS_CODES,
+        configure_rate_limiter,
+        get_rate_limiter,
+    )
+    from ._single_flight import SingleFlight
+except ImportError:
+    from _cache import NegativeCache, PageCache
+    from _frontier import BestFirstFrontier, CrawlBudget
+    from _journal import CrawlJournal
+    from _metrics import CrawlMetrics
+    from _normalize import get_normalizer, register_rules
+    from _parsing import ParsingPool, chain, completed
+    from _registry import ScrapperRegistry
+    from _rate_limiter import (
+        RETRY_STATUS_CODES,
+        configure_rate_limiter,
+        get_rate_limiter,
+    )
+    from _single_flight import SingleFlight
+
+# lxml is much faster than the pure python html.parser
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+# the status codes of the pages that do not exist on the website
+MISSING_STATUS_CODES = (404, 410)
+
 __author__ = "GLNB"
 __copyright__ = "GLNB"
 __license__ = "mit"
 
+__all__ = [
+    "SynonymsGetter",
+    "SynonymsGetterSynonymesCom",
+    "SynonymsGetterLesSynonymesCom",
+    "SynonymsGetterLeFigaro",
+    "SynonymsGetterCrisco2",
+    "SynonymsGetterReverso",
+    "SynonymsGetterLexico",
+    "SynonymsGetterSynonymsCom",
+    "SynonymsGetterNechybujtem",
+    "SynonymsSynonymus",
+    "SynonymsMijnwoordenboek",
+    "SynonymsSynonymeDe",
+    "SynonymsVirgilio",
+    "SynonymsSinonim",
+    "SynonymsSynonymonline",
+    "CrawlJournal",
+    "CrawlMetrics",
+    "Graph",
+    "HTML_PARSER",
+    "MISSING_STATUS_CODES",
+    "NegativeCache",
+    "PageCache",
+    "ParsingPool",
+    "ScrapperRegistry",
+    "UA",
+    "configure_rate_limiter",
+    "explore_scrappers",
+    "get_synonyms_from_scrappers",
+    "register_rules",
+    "scrappers",
+]
+
 _logger = logging.getLogger(__name__)
 __location__ = os.path.join(
     os.getcwd(), os.path.dirname(inspect.getfile(inspect.currentframe()))
@@ -65,30 +135,220 @@ class SynonymsGetter:
     _ua = UA
     # The word will be converted to ASCII
     unidecode_word = True
+    # the parser used by BeautifulSoup (lxml if installed)
+    html_parser = HTML_PARSER
+    # only the tags matching this SoupStrainer are parsed.
+    # Each scrapper should set it to the tags containing the synonyms
+    parse_only = None
+    # rate limiting (see configure_rate_limiter() to change it at runtime)
+    requests_per_second = 1.0
+    burst = 2
+    max_concurrency = 4
+    # number of times a request is sent again after a 429 or 503
+    max_retries = 4
+    # the pages are streamed: only the first max_body_size bytes are
+    # downloaded, and the download stops once end_marker (bytes) is
+    # received. Set it to a tag that always follows the synonyms on the page
+    max_body_size = 1024 * 1024
+    end_marker = None
+    chunk_size = 16 * 1024
+    # the bodies of the responses of other types are not downloaded
+    content_types = ("text/html", "application/xhtml+xml")
+    # pages without synonyms, shared by all the scrappers
+    negative_cache = NegativeCache()
+    # synonyms of the pages already downloaded (disabled by default),
+    # revalidated with their ETag / Last-Modified when they expire
+    page_cache = None
+    # concurrent requests of the same page share one download and parsing
+    _single_flight = SingleFlight()
+    # requests, parsing and caches metrics, per website
+    metrics = CrawlMetrics()
+    # the scheme and host of the website. Can be overridden to
+    # point the scrapper to another server (a local replay server for instance)
+    base_url = None
+    # attributes that are not sent to the parsing processes
+    _process_local_attributes = (
+        "negative_cache",
+        "page_cache",
+        "_single_flight",
+        "metrics",
+    )
+
+    def __getstate__(self):
+        # only the configuration of the scrapper is sent to the parsing
+        # processes, not the caches attached to the instance
+        return {
+            k: v
+            for k, v in self.__dict__.items()
+            if k not in self._process_local_attributes
+        }
 
     def __str__(self):
         if hasattr(self, "website"):
             return f"crawler of {self.website}"
         return "SynonymsGetter object"
 
-    def _get_results_from_website(self, word):
-        """This method should be implemented differently for every languages
-        and every websites (scrapping method different).
-        It sould return an iterable of synonyms scrapped from the website"""
+    def _build_url(self, word):
+        """This method should be implemented differently for every websites.
+        It should return the url of the page containing the synonyms of the word"""
+        return None
+
+    def _extract_words(self, soup):
+        """This method should be implemented differently for every websites
+        (scrapping method different).
+        It sould return an iterable of synonyms found in the BeautifulSoup of the page"""
         return []
 
+    def _get_results_from_website(self, word, parsing_pool=None):
+        """return the list of synonyms of the word scrapped from the website
+
+        Args:
+            word (str): the word
+            parsing_pool (ParsingPool, optional): if given, the page is parsed in this process pool
+        """
+        return self._fetch_results(word, parsing_pool)[0]
+
+    def _fetch_results(self, word, parsing_pool=None):
+        """return the list of synonyms of the word and :obj:`False` if the
+        page could not be downloaded (in which case the results should not be stored)"""
+        words, complete = self._submit_results(word, parsing_pool).result()
+        return list(words), complete
+
+    def _submit_results(self, word, parsing_pool=None):
+        """same as :meth:`_fetch_results` but return a
+        :obj:`concurrent.futures.Future`. If a :obj:`ParsingPool` is given,
+        the thread does not wait for the page to be parsed"""
+        url = self._build_url(word)
+        if not url:
+            return completed(([], True))
+        return self._single_flight.do(url, self._download_and_submit, url, parsing_pool)
+
+    def _get_crawl_results(self, word, journal=None, parsing_pool=None):
+        """same as :meth:`_get_results_from_website` but the results are
+        read from (or written to) the journal of the crawl"""
+        return self._submit_crawl_results(word, journal, parsing_pool).result()
+
+    def _submit_crawl_results(self, word, journal=None, parsing_pool=None):
+        """same as :meth:`_get_crawl_results` but return a
+        :obj:`concurrent.futures.Future` of the list of synonyms"""
+        url = self._build_url(word) if journal is not None else None
+        words = journal.get(url) if url else None
+        if words is not None:
+            return completed(words)
+
+        def record(results):
+            words, complete = results
+            if url and complete:
+                journal.record(url, words)
+            return list(words)
+
+        return chain(self._submit_results(word, parsing_pool), record)
+
+    async def get_results_async(self, word: str, parsing_pool=None) -> list:
+        """asyncio version of :meth:`_get_results_from_website`
+
+        The page is downloaded in the default executor of the event loop.
+        Concurrent coroutines (or threads) asking for the same page share
+        the same download.
+
+        .. code:: python
+
+            >>> import asyncio
+            >>> from lexicons_builder.scrappers.scrappers import SynonymsGetterCrisco2
+            >>> scrapper = SynonymsGetterCrisco2()
+            >>> async def main(words):
+            ...     return await asyncio.gather(*[scrapper.get_results_async(w) for w in words])
+            >>> asyncio.run(main(["livre", "livre", "lire"]))
+
+        """
+        url = self._build_url(word)
+        if not url:
+            return []
+        words, _ = await self._single_flight.do_async(
+            url, self._download_and_extract, url, parsing_pool
+        )
+        return list(words)
+
+    def _download_and_extract(self, url, parsing_pool=None):
+        return self._download_and_submit(url, parsing_pool).result()
+
+    def _download_and_submit(self, url, parsing_pool=None):
+        """download the page and return a :obj:`concurrent.futures.Future`
+        of the synonyms it contains (see :meth:`_fetch_results`). If a
+        :obj:`ParsingPool` is given, the page is parsed in the pool and the
+        future is done once it is parsed"""
+        website = getattr(self, "website", str(self))
+        if url in self.negative_cache:
+            logging.debug(f"'{url}' is a known miss -> skipping it")
+            self.metrics.record_cache(website, hit=True)
+            return completed(([], True))
+        cached = self.page_cache.get(url) if self.page_cache is not None else None
+        if cached is not None and self.page_cache.is_fresh(cached):
+            self.metrics.record_cache(website, hit=True)
+            return completed((list(cached["words"]), True))
+        # an expired page is only downloaded again if it changed
+        r = self._request(url, cached and self.page_cache.validators(cached))
+        if cached is not None and r.status_code == 304:
+            logging.debug(f"'{url}' did not change")
+            self.metrics.record_cache(website, hit=True)
+            return completed((list(self.page_cache.refresh(url)["words"]), True))
+        self.metrics.record_cache(website, hit=False)
+        html = r.text if r.ok else ""
+        if parsing_pool is None or not html:
+            start = time.perf_counter()
+            words = self.extract_words_from_html(html)
+            return completed(
+                self._store_results(url, r, words, time.perf_counter() - start)
+            )
+        return chain(
+            parsing_pool.submit(self, html),
+            lambda parsed: self._store_results(url, r, *parsed),
+        )
+
+    def _store_results(self, url, r, words, parse_time):
+        """record the words found on the downloaded page in the caches"""
+        website = getattr(self, "website", str(self))
+        self.metrics.record_page(website, parse_time, len(words))
+        missing = r.status_code in MISSING_STATUS_CODES
+        if missing:
+            self.negative_cache.add(url, len(r.content))
+        elif not r.body_complete:
+            # the words of a truncated or skipped page may not be all its words
+            logging.debug(f"'{url}' was not fully downloaded -> not caching it")
+        elif r.ok and not words:
+            self.negative_cache.add(url, len(r.content))
+        elif r.ok and self.page_cache is not None:
+            self.page_cache.add(
+                url, words, r.headers.get("ETag"), r.headers.get("Last-Modified")
+            )
+        return words, r.ok or missing
+
+    def extract_words_from_html(self, html: str) -> list:
+        """parse the html page and return the synonyms it contains"""
+        return list(self._extract_words(self.parse_page(html)))
+
+    @property
+    def normalizer(self):
+        """the :obj:`Normalizer` of the words found, shared by the scrappers of the language"""
+        return get_normalizer(getattr(self, "lang", None), self.unidecode_word)
+
+    def _normalize_word(self, word: str) -> str:
+        return self.normalizer(word)
+
     def explore_reccursively(
         self,
         word: str,
         max_depth: int = 2,
         current_depth=1,
         _previous_graph=None,
+        journal=None,
     ) -> Graph:
         """Search for terms reccursively from the website
 
         Args:
             word (str): the word
             max_depth (int): the deepth of the reccursion
+            journal (CrawlJournal, optional): the journal where the pages looked up are stored. The pages already in the journal are not downloaded again
         Returns:
             a Graph object with the words that were looked up
 
@@ -114,13 +374,12 @@ class SynonymsGetter:
             return graph
 
         else:
-            new_words = [w for w in self._get_results_from_website(word) if w]
+            new_words = [w for w in self._get_crawl_results(word, journal) if w]
             logging.info(f"{len(new_words)} found")
             for n_word in new_words:
-                if self.unidecode_word:
-                    n_word = unidecode(n_word.lower())
-                else:
-                    n_word = n_word.lower()
+                n_word = self._normalize_word(n_word)
+                if not n_word:
+                    continue
                 if n_word in graph:
                     logging.debug(f"n_word is already in the graph -> skipping it")
                     continue
@@ -132,41 +391,250 @@ class SynonymsGetter:
                     current_depth=current_depth + 1,
                     max_depth=max_depth,
                     _previous_graph=graph,
+                    journal=journal,
                 )
         return graph
 
-    def download_and_parse_page(self, url: str) -> BeautifulSoup:
-        """return the Beautiful soup of the page
+    def explore_by_level(
+        self,
+        word: str,
+        max_depth: int = 2,
+        fetch_workers: int = 4,
+        parsing_pool=None,
+        journal=None,
+    ) -> Graph:
+        """Search for terms level by level (breadth first) from the website
 
-        If the http response from the page is not ok,
-        return an empty BeautifulSoup
+        All the words of a level are downloaded concurrently by
+        ``fetch_workers`` threads. If a :obj:`ParsingPool` is given, the
+        pages are parsed in its processes so the parsing does not hold
+        the GIL of the threads downloading the pages, which go on with
+        the next pages while the previous ones are parsed.
 
         Args:
-            url (str): the url of the webpage
+            word (str): the word
+            max_depth (int): the deepth of the exploration
+            fetch_workers (int, optional): the number of threads downloading the pages
+            parsing_pool (ParsingPool, optional): the process pool parsing the pages
+            journal (CrawlJournal, optional): the journal where the pages looked up are stored
+        Returns:
+            a Graph object with the words that were looked up
+
+        .. code:: python
+
+            >>> from lexicons_builder.scrappers.scrappers import SynonymsGetterCrisco2, ParsingPool
+            >>> with ParsingPool() as pool:
+            ...     g = SynonymsGetterCrisco2().explore_by_level("livre", 2, 8, pool)
+
+        """
+        return explore_scrappers(
+            word,
+            [self],
+            max_depth,
+            fetch_workers=fetch_workers,
+            parsing_pool=parsing_pool,
+            journal=journal,
+        )
+
+    def explore_best_first(
+        self,
+        word: str,
+        max_depth: int = 3,
+        max_pages: int = None,
+        max_seconds: float = None,
+        fetch_workers: int = 1,
+        parsing_pool=None,
+        journal=None,
+    ) -> Graph:
+        """Search for terms from the website, expanding the most promising words first
+
+        The words reached from more parents are expanded first (then the
+        words closer to the root). The exploration stops when there is no
+        word left to expand under ``max_depth``, or when ``max_pages`` pages
+        were looked up, or after ``max_seconds`` seconds.
+
+        Args:
+            word (str): the word
+            max_depth (int): the maximum depth of the words
+            max_pages (int, optional): the maximum number of pages looked up
+            max_seconds (float, optional): the maximum duration of the exploration
+            fetch_workers (int, optional): the number of threads downloading the pages
+            parsing_pool (ParsingPool, optional): the process pool parsing the pages
+            journal (CrawlJournal, optional): the journal where the pages looked up are stored
         Returns:
-            BeautifulSoup: the BeautifulSoup of the page parsed with html.parser
+            a Graph object with the words that were looked up
+
+        .. code:: python
+
+            >>> from lexicons_builder.scrappers.scrappers import SynonymsGetterCrisco2
+            >>> # depth 3 but never more than 200 pages
+            >>> g = SynonymsGetterCrisco2().explore_best_first("livre", 3, max_pages=200)
+
+        """
+        return explore_scrappers(
+            word,
+            [self],
+            max_depth,
+            fetch_workers=fetch_workers,
+            parsing_pool=parsing_pool,
+            journal=journal,
+            max_pages=max_pages,
+            max_seconds=max_seconds,
+        )
+
+    @property
+    def rate_limiter(self):
+        """the :obj:`RateLimiter` shared by all the scrappers of the website"""
+        return get_rate_limiter(
+            getattr(self, "website", str(self)),
+            rate=self.requests_per_second,
+            burst=self.burst,
+            max_concurrency=self.max_concurrency,
+        )
+
+    def _request(self, url: str, headers: dict = None) -> requests.Response:
+        """send the GET request to the website and return the response
+
+        The requests are rate limited per website. If the website responds
+        with a 429 or a 503, the request is sent again after waiting for
+        the time given by the ``Retry-After`` header (or an exponential
+        backoff if there is none).
+
+        Args:
+            url (str): the url of the page
+            headers (dict, optional): headers sent in addition to the user agent
         """
-        logging.info(f"getting {url}")
-        r = requests.get(url, headers={"User-Agent": self._ua})
+        headers = {"User-Agent": self._ua, **(headers or {})}
+        limiter = self.rate_limiter
+        website = getattr(self, "website", str(self))
+        for attempt in range(self.max_retries + 1):
+            logging.info(f"getting {url}")
+            with limiter.slot():
+                start = time.perf_counter()
+                try:
+                    r = requests.get(url, headers=headers, stream=True)
+                    # a truncated or skipped body is not cached
+                    r.body_complete = self._read_body(r)
+                except requests.RequestException:
+                    limiter.record(error=True)
+                    raise
+                latency = time.perf_counter() - start
+            self.metrics.record_request(website, latency, r.status_code, len(r.content))
+            retry = r.status_code in RETRY_STATUS_CODES
+            # a missing page is a normal answer of the website,
+            # only the errors of the website lower the concurrency
+            missing = r.status_code in MISSING_STATUS_CODES
+            limiter.record(error=retry or not (r.ok or missing))
+            if not retry or attempt == self.max_retries:
+                break
+            # the next limiter.slot() waits for the delay
+            delay = limiter.backoff(attempt, r.headers.get("Retry-After"))
+            logging.warning(
+                f"the website responded {r.status_code}. Retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})"
+            )
         if r.status_code == 429:
             logging.error(f"the website responded to 429 Too Many Requests")
         if not r.ok:
             logging.error(f"request is not ok. Status code is {r.status_code}")
+        return r
+
+    def _read_body(self, r: requests.Response) -> bool:
+        """download the body of the streamed response, up to :attr:`max_body_size`
+        bytes or until :attr:`end_marker` is received. The body is then available
+        as usual with ``r.content`` and ``r.text``
+
+        Returns:
+            bool: False if the body was truncated at :attr:`max_body_size` or
+            skipped (not a html page). A body stopped at :attr:`end_marker` is complete
+        """
+        content_type = r.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        body = bytearray()
+        complete = True
+        if (
+            content_type
+            and self.content_types
+            and content_type not in self.content_types
+        ):
+            logging.warning(
+                f"'{r.url}' is not a html page ({content_type}) -> skipping its content"
+            )
+            complete = False
+        else:
+            marker = self.end_marker or b""
+            for chunk in r.iter_content(self.chunk_size):
+                # the marker can be split between two chunks
+                start = max(0, len(body) - len(marker) + 1)
+                body += chunk
+                end = body.find(marker, start) if marker else -1
+                if end != -1 and end + len(marker) <= self.max_body_size:
+                    logging.debug(
+                        "end of the synonyms reached -> stopping the download"
+                    )
+                    del body[end + len(marker) :]
+                    break
+                if len(body) > self.max_body_size:
+                    logging.warning(
+                        f"'{r.url}' is larger than {self.max_body_size} bytes -> truncating it"
+                    )
+                    del body[self.max_body_size :]
+                    complete = False
+                    break
+        r.close()
+        r._content = bytes(body)
+        r._content_consumed = True
+        return complete
+
+    def download_page(self, url: str) -> str:
+        """return the html of the page
+
+        If the http response from the page is not ok,
+        return an empty string
+
+        Args:
+            url (str): the url of the webpage
+        Returns:
+            str: the html of the page
+        """
+        r = self._request(url)
+        if not r.ok:
+            return ""
+        return r.text
+
+    def parse_page(self, html: str) -> BeautifulSoup:
+        """return the BeautifulSoup of the html page parsed with :attr:`html_parser`,
+        restricted to the tags matching :attr:`parse_only`"""
+        if not html:
             # returning an empty BautifulSoup Object
             return BeautifulSoup("", "html.parser")
-        return BeautifulSoup(r.text, "html.parser")
+        return BeautifulSoup(html, self.html_parser, parse_only=self.parse_only)
+
+    def download_and_parse_page(self, url: str) -> BeautifulSoup:
+        """return the Beautiful soup of the page
+
+        If the http response from the page is not ok,
+        return an empty BeautifulSoup
+
+        Args:
+            url (str): the url of the webpage
+        Returns:
+            BeautifulSoup: the BeautifulSoup of the page (see :meth:`parse_page`)
+        """
+        return self.parse_page(self.download_page(url))
 
 
 class SynonymsGetterSynonymesCom(SynonymsGetter):
     """Scrapper of `synonymes.com <http://www.synonymes.com>`_"""
 
     website = "synonymes.com"
+    base_url = "https://www.synonymes.com"
     lang = "fr"
+    parse_only = SoupStrainer("div", class_="defbox")
 
-    def _get_results_from_website(self, word):
+    def _build_url(self, word):
         word = unidecode(word.lower())
-        url = f"https://www.synonymes.com/synonyme.php?mot={word}"
-        soup = self.download_and_parse_page(url)
+        return f"{self.base_url}/synonyme.php?mot={word}"
+
+    def _extract_words(self, soup):
         words = []
         for box in soup.find_all("div", class_="defbox"):
             for word in box.find_all("a", href=True):
@@ -199,12 +667,15 @@ class SynonymsGetterLesSynonymesCom(SynonymsGetter):
     """Scrapper of `les-synonymes.com <http://www.les-synonymes.com>`_"""
 
     website = "les-synonymes.com"
+    base_url = "http://www.les-synonymes.com"
     lang = "fr"
+    parse_only = SoupStrainer("a", href=re.compile(r"^mot/"))
 
-    def _get_results_from_website(self, word):
+    def _build_url(self, word):
         # word = unidecode(word.lower())
-        url = f"http://www.les-synonymes.com/mot/{word}"
-        soup = self.download_and_parse_page(url)
+        return f"{self.base_url}/mot/{word}"
+
+    def _extract_words(self, soup):
         words = []
         for link in soup.find_all("a", href=True):
             if link["href"].startswith("mot/"):
@@ -216,15 +687,22 @@ class SynonymsGetterLeFigaro(SynonymsGetter):
     """Scrapper of `leconjugueur.lefigaro.fr <https://leconjugueur.lefigaro.fr>`_"""
 
     website = "leconjugueur.lefigaro.fr"
+    base_url = "https://leconjugueur.lefigaro.fr"
     lang = "fr"
+    # the scripts and links of the footer are not downloaded
+    end_marker = b"<footer"
+    parse_only = SoupStrainer(
+        "a", href=re.compile(r"^/synonyme/"), title=re.compile(r"^Synonymes de ")
+    )
 
-    def _get_results_from_website(self, word):
+    def _build_url(self, word):
         # diacritics are important on that website
         # but œ should be changed
         word = word.replace("œ", "oe")
 
-        url = f"https://leconjugueur.lefigaro.fr/frsynonymes.php?mot={word}"
-        soup = self.download_and_parse_page(url)
+        return f"{self.base_url}/frsynonymes.php?mot={word}"
+
+    def _extract_words(self, soup):
         words = []
         for link in soup.find_all("a", href=True):
             if link["href"].startswith("/synonyme/") and link["title"].startswith(
@@ -238,15 +716,18 @@ class SynonymsGetterCrisco2(SynonymsGetter):
     """Scrapper of `crisco2.unicaen.fr <https://crisco2.unicaen.fr>`_"""
 
     website = "crisco2.unicaen.fr"
+    base_url = "https://crisco2.unicaen.fr"
     lang = "fr"
+    parse_only = SoupStrainer("a", href=re.compile(r"^/des/synonymes/"))
 
-    def _get_results_from_website(self, word):
+    def _build_url(self, word):
         # diacritics are important on that website
         # but œ should be remplaced
         word = word.replace("œ", "oe")
 
-        url = f"https://crisco2.unicaen.fr/des/synonymes/{word}"
-        soup = self.download_and_parse_page(url)
+        return f"{self.base_url}/des/synonymes/{word}"
+
+    def _extract_words(self, soup):
         words = []
         for link in soup.find_all("a", href=True):
             if link["href"].startswith("/des/synonymes/"):
@@ -259,7 +740,11 @@ class SynonymsGetterReverso(SynonymsGetter):
     Website includes synonyms in French, English, German, Spanish, Italian"""
 
     website = "synonyms.reverso.net"
+    base_url = "https://synonyms.reverso.net"
+    # the scripts and links of the footer are not downloaded
+    end_marker = b"<footer"
     implemented_languages = {"fr", "en", "es", "it", "de"}
+    parse_only = SoupStrainer("li", id=re.compile(r"^synonym-"))
 
     def __init__(self, lang):
         super().__init__()
@@ -267,13 +752,14 @@ class SynonymsGetterReverso(SynonymsGetter):
             raise ValueError(f"'{lang}' language not implemented")
         self.lang = lang
 
-    def _get_results_from_website(self, word):
+    def _build_url(self, word):
         # diacritics are important on that website
         # but œ should be remplaced
         word = word.replace("œ", "oe")
 
-        url = f"https://synonyms.reverso.net/synonyme/{self.lang}/{word}"
-        soup = self.download_and_parse_page(url)
+        return f"{self.base_url}/synonyme/{self.lang}/{word}"
+
+    def _extract_words(self, soup):
         words = []
         for element in soup.find_all("li", id=True):
             if not element["id"].startswith("synonym-"):
@@ -288,12 +774,15 @@ class SynonymsGetterLexico(SynonymsGetter):
     """Scrapper of `lexico.com <https://www.lexico.com>`_"""
 
     website = "lexico.com"
+    base_url = "https://www.lexico.com"
     lang = "en"
+    parse_only = SoupStrainer(["strong", "span"], class_="syn")
 
-    def _get_results_from_website(self, word):
+    def _build_url(self, word):
         word = unidecode(word.lower())
-        url = f"https://www.lexico.com/synonyms/{word}"
-        soup = self.download_and_parse_page(url)
+        return f"{self.base_url}/synonyms/{word}"
+
+    def _extract_words(self, soup):
         words = []
         for word in soup.find_all("strong", class_="syn"):
             words.append(word.text.strip())
@@ -308,12 +797,15 @@ class SynonymsGetterSynonymsCom(SynonymsGetter):
     """Scrapper of `synonyms.com <https://www.synonyms.com>`_"""
 
     website = "synonyms.com"
+    base_url = "https://www.synonyms.com"
     lang = "en"
+    parse_only = SoupStrainer("p", class_="syns")
 
-    def _get_results_from_website(self, word):
+    def _build_url(self, word):
         word = unidecode(word.lower())
-        url = f"https://www.synonyms.com/synonym/{word}"
-        soup = self.download_and_parse_page(url)
+        return f"{self.base_url}/synonym/{word}"
+
+    def _extract_words(self, soup):
         words = []
         for p in soup.find_all("p", class_="syns"):
             for link in p.find_all("a", href=True):
@@ -346,15 +838,19 @@ class SynonymsGetterNechybujtem(SynonymsGetter):
     """Scrapper of `nechybujte.cz <https://www.nechybujte.cz/slovnik-ceskych-synonym>`_"""
 
     website = "nechybujte.cz"
+    base_url = "https://www.nechybujte.cz"
     lang = "cs"
+    parse_only = SoupStrainer("span", class_="ths_syns1")
 
-    def _get_results_from_website(self, word):
+    def _build_url(self, word):
         # word = unidecode(word.lower())
-        url = f"https://www.nechybujte.cz/slovnik-ceskych-synonym/{word}?"
-        soup = self.download_and_parse_page(url)
+        return f"{self.base_url}/slovnik-ceskych-synonym/{word}?"
+
+    def _extract_words(self, soup):
         words = []
         for span in soup.find_all("span", class_="ths_syns1"):
-            text = re.sub(r"\(.*?\)", "", span.text)
+            # the annotations are removed before splitting the words
+            text = self._normalize_word(span.text)
             for w in re.split(r"\s*,?\s+", text):
                 words.append(w.strip())
         return list(set(words))
@@ -367,20 +863,20 @@ class SynonymsSynonymus(SynonymsGetter):
     """Scrapper of `synonymus.cz <https://www.synonymus.cz/>`_"""
 
     website = "synonymus.cz"
+    base_url = "https://synonymus.cz"
     lang = "cs"
+    parse_only = SoupStrainer("ul", class_="list-group")
 
-    def _get_results_from_website(self, word):
+    def _build_url(self, word):
         # word = unidecode(word.lower())
-        url = f"https://synonymus.cz/search?query={word}"
-        soup = self.download_and_parse_page(url)
+        return f"{self.base_url}/search?query={word}"
+
+    def _extract_words(self, soup):
         words = []
         for w in soup.find("ul", class_="list-group").find_all("a"):
             # some words have parenthesis and tags eg: sníst <čeho> (hodně)
-            word = w.text
-            word = re.sub(r"\(.*?\)", "", word)
-            word = re.sub(r"<.*?>", "", word)
-            word = word.strip()
-            words.append(word)
+            # they are removed by the normalizer
+            words.append(w.text)
         return list(set(words))
 
 
@@ -388,12 +884,15 @@ class SynonymsMijnwoordenboek(SynonymsGetter):
     """Scrapper of `mijnwoordenboek.nl <https://www.mijnwoordenboek.nl/synoniem.php>`_"""
 
     website = "mijnwoordenboek.nl"
+    base_url = "https://www.mijnwoordenboek.nl"
     lang = "nl"
+    parse_only = SoupStrainer("ul", class_="icons-ul")
 
-    def _get_results_from_website(self, word):
+    def _build_url(self, word):
         # word = unidecode(word.lower())
-        url = f"https://www.mijnwoordenboek.nl/synoniem.php?woord={word}&lang=NL"
-        soup = self.download_and_parse_page(url)
+        return f"{self.base_url}/synoniem.php?woord={word}&lang=NL"
+
+    def _extract_words(self, soup):
         words = []
         for div in soup.find_all("ul", class_="icons-ul"):
             for link in div.find_all("a", href=True):
@@ -402,10 +901,7 @@ class SynonymsMijnwoordenboek(SynonymsGetter):
                     link["href"],
                 ):
                     continue
-                # some words have parenthesis and tags eg: sníst <čeho> (hodně)
                 word = link.text.lower()
-                # word = re.sub(r"\(.*?\)", "", word)
-                # word = re.sub(r"<.*?>", "", word)
                 word = word.strip()
                 words.append(word)
         return list(set(words))
@@ -415,17 +911,18 @@ class SynonymsSynonymeDe(SynonymsGetter):
     """Scrapper of `https://www.synonyme.de <https://www.synonyme.de>`_"""
 
     website = "https://www.synonyme.de"
+    base_url = "https://www.synonyme.de"
     lang = "de"
+    parse_only = SoupStrainer("div", class_="synonymes")
 
-    def _get_results_from_website(self, word):
+    def _build_url(self, word):
         # word = unidecode(word.lower())
-        url = f"https://www.synonyme.de/{word}/"
-        soup = self.download_and_parse_page(url)
+        return f"{self.base_url}/{word}/"
+
+    def _extract_words(self, soup):
         words = []
         for syn in soup.find_all("div", class_="synonymes"):
             word = syn.text.strip().lower()
-            # word = re.sub(r"\(.*?\)", "", word)
-            # word = re.sub(r"<.*?>", "", word)
             words.append(word)
         return list(set(words))
 
@@ -434,12 +931,15 @@ class SynonymsVirgilio(SynonymsGetter):
     """Scrapper of `https://sapere.virgilio.it <https://sapere.virgilio.it>`_"""
 
     website = "https://sapere.virgilio.it"
+    base_url = "https://sapere.virgilio.it"
     lang = "it"
+    parse_only = SoupStrainer("div", class_="sct-descr")
 
-    def _get_results_from_website(self, word):
+    def _build_url(self, word):
         # word = unidecode(word.lower())
-        url = f"https://sapere.virgilio.it/parole/sinonimi-e-contrari/{word}"
-        soup = self.download_and_parse_page(url)
+        return f"{self.base_url}/parole/sinonimi-e-contrari/{word}"
+
+    def _extract_words(self, soup):
         words = []
         for par in soup.find("div", class_="sct-descr").find_all("p"):
             if par.text == "Sinonimi":
@@ -456,13 +956,18 @@ class SynonymsSinonim(SynonymsGetter):
     Often blocks the requests if they are too many"""
 
     website = "https://sinonim.org"
+    base_url = "https://sinonim.org"
     lang = "ru"
     unidecode_word = False
+    requests_per_second = 0.5
+    burst = 1
+    parse_only = SoupStrainer("td", class_="nach")
 
-    def _get_results_from_website(self, word):
+    def _build_url(self, word):
         # word = unidecode(word.lower())
-        url = f"https://sinonim.org/s/{word}"
-        soup = self.download_and_parse_page(url)
+        return f"{self.base_url}/s/{word}"
+
+    def _extract_words(self, soup):
         words = []
         for syn in soup.find_all("td", class_="nach"):
             for w in syn.text.strip(" https://sinonim.org/").split(", "):
@@ -476,14 +981,16 @@ class SynonymsSynonymonline(SynonymsGetter):
     """Scrapper of `synonymonline.ru <synonymonline.ru>`_"""
 
     website = "synonymonline.ru"
+    base_url = "https://synonymonline.ru"
     lang = "ru"
     unidecode_word = False
+    parse_only = SoupStrainer("ol", class_="synonyms-list")
 
-    def _get_results_from_website(self, word):
+    def _build_url(self, word):
         # word = word.strip('ь') # removing the 'ь' character at the end
-        url = f"https://synonymonline.ru/{word[0].upper()}/{word}"
-        logging.debug(f"url is '{url}'")
-        soup = self.download_and_parse_page(url)
+        return f"{self.base_url}/{word[0].upper()}/{word}"
+
+    def _extract_words(self, soup):
         words = []
         for ol in soup.find_all("ol", class_="synonyms-list"):
             for span in ol.find_all("span"):
@@ -491,39 +998,250 @@ class SynonymsSynonymonline(SynonymsGetter):
         return list(set(words))
 
 
-scrappers = {
-    "en": [
-        SynonymsGetterLexico(),
-        SynonymsGetterSynonymsCom(),
-        SynonymsGetterReverso("en"),
-    ],
-    "fr": [
-        # SynonymsGetterSynonymesCom(),
-        # SynonymsGetterDictionnaireSynonymesCom(),
-        # SynonymsGetterLesSynonymesCom(),
-        SynonymsGetterLeFigaro(),
-        SynonymsGetterCrisco2(),
-        # SynonymsGetterReverso("fr"),
-    ],
-    "es": [SynonymsGetterReverso("es")],
-    "it": [SynonymsGetterReverso("it")],
-    "de": [SynonymsGetterReverso("de")],
-    "cs": [SynonymsGetterNechybujtem(), SynonymsSynonymus()],
-    "nl": [SynonymsMijnwoordenboek()],
-    "de": [SynonymsSynonymeDe()],
-    "it": [SynonymsVirgilio()],
-    "ru": [SynonymsSinonim(), SynonymsSynonymonline()],
-}
-
-
-def get_synonyms_from_scrappers(word, lang, depth, merge_graph=True) -> Graph:
+def explore_scrappers(
+    word: str,
+    scrapper_list: list,
+    max_depth: int = 2,
+    fetch_workers: int = 1,
+    parsing_pool=None,
+    journal=None,
+    max_pages: int = None,
+    max_seconds: float = None,
+) -> Graph:
+    """Explore several websites over one shared frontier
+
+    Each word is looked up once on every website, and the words found are
+    added to one graph (with the website they come from) instead of
+    building one graph per website and merging them afterwards. A word
+    found at depth 1 on a website is therefore not expanded again at
+    depth 2 because another website found it later.
+
+    Several root words can be given: they are explored at once, so the
+    words they have in common are only looked up once. The graph then
+    records the root words each word was found from (see
+    :meth:`Graph.get_root_words_of`).
+
+    The words are explored level by level (breadth first). If
+    ``max_pages`` or ``max_seconds`` is given, the most promising words
+    (found from more parents or more websites) are explored first and the
+    exploration stops when the budget is spent.
+
+    Args:
+        word (str or [str]): the root word, or several root words
+        scrapper_list ([SynonymsGetter]): the scrappers of the websites
+        max_depth (int): the maximum depth of the words
+        fetch_workers (int, optional): the number of threads downloading the pages
+        parsing_pool (ParsingPool, optional): the process pool parsing the pages
+        journal (CrawlJournal, optional): the journal where the pages looked up are stored
+        max_pages (int, optional): the maximum number of pages looked up (all websites together)
+        max_seconds (float, optional): the maximum duration of the exploration
+    Returns:
+        a Graph object with the words that were looked up
+
+    .. code:: python
+
+        >>> from lexicons_builder.scrappers.scrappers import explore_scrappers, scrappers
+        >>> g = explore_scrappers("livre", scrappers["fr"], 2, fetch_workers=8)
+        >>> g = explore_scrappers(["livre", "lire"], scrappers["fr"], 2, fetch_workers=8)
+        >>> g.get_root_words_of("bouquin")
+        ['lire', 'livre']
+
+    """
+    if not isinstance(max_depth, int):
+        raise TypeError(f"max_depth type should be int not '{type(max_depth)}'")
+
+    root_words = [word] if isinstance(word, str) else list(dict.fromkeys(word))
+    graph = Graph()
+    for root_word in root_words:
+        graph.add_root_word(root_word)
+    roots = set(root_words)
+    seen = set(roots)
+    # (word, website) already added to the graph
+    provenance = set()
+    # word -> words found on its pages
+    children = {}
+
+    def fetch(task):
+        # the thread downloads the next page while this one is parsed
+        scrapper, source, _ = task
+        return scrapper._submit_crawl_results(source, journal, parsing_pool)
+
+    def add_results(scrapper, source, depth, new_words):
+        """add the words found on the page of the source word to the graph.
+        Return the words found and the ones that were not in the graph"""
+        found, added = [], []
+        for n_word in new_words:
+            n_word = scrapper._normalize_word(n_word)
+            if not n_word or n_word == source:
+                continue
+            # the links between root words are kept to attribute the words
+            children.setdefault(source, set()).add(n_word)
+            if n_word in roots:
+                continue
+            found.append(n_word)
+            if (n_word, scrapper.website) in provenance:
+                logging.debug("n_word is already in the graph -> skipping it")
+                continue
+            provenance.add((n_word, scrapper.website))
+            # a word found on another website only gets the new provenance
+            graph.add_word(n_word, depth, "synonym", source, comesFrom=scrapper.website)
+            if n_word not in seen:
+                seen.add(n_word)
+                added.append(n_word)
+        return found, added
+
+    def add_root_words():
+        """record the root words each word can be reached from in max_depth"""
+        for root_word in root_words:
+            reached, level = {root_word}, {root_word}
+            for _ in range(max_depth):
+                level = {c for w in level for c in children.get(w, ())} - reached
+                reached |= level
+            for n_word in reached - roots:
+                graph.add_root_of_word(n_word, root_word)
+
+    # the graph is only modified by this thread
+    with ThreadPoolExecutor(max_workers=fetch_workers) as executor:
+        if max_pages is None and max_seconds is None:
+            frontier = list(root_words)
+            for depth in range(1, max_depth + 1):
+                if not frontier:
+                    break
+                logging.debug(f"exploring {len(frontier)} words at depth {depth}")
+                tasks = [(s, w, depth) for w in frontier for s in scrapper_list]
+                frontier = []
+                for (scrapper, source, depth), new_words in zip(
+                    tasks, executor.map(fetch, tasks)
+                ):
+                    frontier += add_results(
+                        scrapper, source, depth, new_words.result()
+                    )[1]
+            if len(root_words) > 1:
+                add_root_words()
+            return graph
+
+        frontier = BestFirstFrontier()
+        for root_word in root_words:
+            frontier.push(root_word, 0)
+        budget = CrawlBudget(max_pages, max_seconds)
+        # enough pages per batch to keep the threads and the processes busy
+        workers = max(fetch_workers, parsing_pool.max_workers if parsing_pool else 0)
+        while frontier and not budget.exhausted():
+            n_words = max(1, workers // len(scrapper_list))
+            tasks = [
+                (s, w, depth + 1)
+                for w, depth in frontier.pop_many(n_words)
+                for s in scrapper_list
+            ]
+            if budget.max_pages is not None:
+                tasks = tasks[: budget.remaining_pages]
+            for (scrapper, source, depth), new_words in zip(
+                tasks, executor.map(fetch, tasks)
+            ):
+                budget.spend()
+                found, _ = add_results(scrapper, source, depth, new_words.result())
+                if depth < max_depth:
+                    for n_word in found:
+                        # increases the priority if already in the frontier
+                        frontier.push(n_word, depth, source, scrapper.website)
+    if frontier:
+        logging.info(
+            f"budget spent after {budget.pages} pages, {len(frontier)} words not expanded"
+        )
+    if len(root_words) > 1:
+        add_root_words()
+    return graph
+
+
+# the scrappers are created the first time their language is used
+scrappers = ScrapperRegistry(
+    {
+        "en": [
+            SynonymsGetterLexico,
+            SynonymsGetterSynonymsCom,
+            (SynonymsGetterReverso, "en"),
+        ],
+        "fr": [
+            # SynonymsGetterSynonymesCom,
+            # SynonymsGetterDictionnaireSynonymesCom,
+            # SynonymsGetterLesSynonymesCom,
+            SynonymsGetterLeFigaro,
+            SynonymsGetterCrisco2,
+            # (SynonymsGetterReverso, "fr"),
+        ],
+        "es": [(SynonymsGetterReverso, "es")],
+        "it": [(SynonymsGetterReverso, "it"), SynonymsVirgilio],
+        "de": [(SynonymsGetterReverso, "de"), SynonymsSynonymeDe],
+        "cs": [SynonymsGetterNechybujtem, SynonymsSynonymus],
+        "nl": [SynonymsMijnwoordenboek],
+        "ru": [SynonymsSinonim, SynonymsSynonymonline],
+    }
+)
+
+
+def _explore_scrapper(
+    scrapper, word, depth, fetch_workers, parsing_pool, journal, max_pages, max_seconds
+) -> Graph:
+    "explore the website with the crawl mode matching the options"
+    if not isinstance(word, str):
+        # several root words share the same crawl
+        return explore_scrappers(
+            word,
+            [scrapper],
+            depth,
+            fetch_workers,
+            parsing_pool,
+            journal,
+            max_pages,
+            max_seconds,
+        )
+    if max_pages is not None or max_seconds is not None:
+        return scrapper.explore_best_first(
+            word,
+            depth,
+            max_pages,
+            max_seconds,
+            fetch_workers,
+            parsing_pool,
+            journal=journal,
+        )
+    if fetch_workers > 1 or parsing_pool:
+        # the pages are downloaded by threads and parsed in other processes
+        # but the graph is only modified by this thread
+        return scrapper.explore_by_level(
+            word, depth, fetch_workers, parsing_pool, journal=journal
+        )
+    # thread safe version. Takes a while but it works
+    return scrapper.explore_reccursively(word, depth, journal=journal)
+
+
+def get_synonyms_from_scrappers(
+    word,
+    lang,
+    depth,
+    merge_graph=True,
+    fetch_workers=1,
+    parse_workers=0,
+    resume=None,
+    max_pages=None,
+    max_seconds=None,
+    shared_frontier=False,
+    page_cache=None,
+) -> Graph:
     """Scrap the websites recursively given the input word
 
     Args:
-        word (str): The word that will be looked up
+        word (str or [str]): The word that will be looked up. If several words are given, they are explored at once and the words they have in common are only looked up once (see :meth:`explore_scrappers`)
         lang (str): The language of the word
         deepth (int): The deepth of the reccursion
         merge_graph (bool, optional): by default, returns a merged graph. If set to :obj:`False`, return a list of :obj:`Graph`
+        fetch_workers (int, optional): the number of threads downloading the pages of each website
+        parse_workers (int, optional): the number of processes parsing the pages. If ``fetch_workers`` or ``parse_workers`` is set, the websites are explored level by level (see :meth:`SynonymsGetter.explore_by_level`)
+        resume (str, optional): the path of the journal of the crawl. If the crawl stopped, calling the function again with the same journal continues it without downloading the pages already looked up
+        max_pages (int, optional): the maximum number of pages looked up on each website. If ``max_pages`` or ``max_seconds`` is set, the most promising words are expanded first (see :meth:`SynonymsGetter.explore_best_first`)
+        max_seconds (float, optional): the maximum duration of the exploration of each website
+        shared_frontier (bool, optional): explore all the websites of the language over one shared frontier (see :meth:`explore_scrappers`). Each word is then looked up once on each website and one graph is built (the budget is then shared by the websites)
+        page_cache (str, optional): the path of the cache of the pages (see :obj:`PageCache`). The pages in the cache are only downloaded again if they changed on the website
 
     Returns:
         :obj:`Graph` : the graph containing the synonyms
@@ -538,6 +1256,8 @@ def get_synonyms_from_scrappers(word, lang, depth, merge_graph=True) -> Graph:
     """
     if lang not in scrappers:
         raise ValueError(f"lang '{lang}' not implemented yet.")
+    if not isinstance(word, str) and len(word) == 1:
+        word = word[0]
 
     # WARNING: using the scrapping with threads might not work as
     # the rdflib.plugins.sparql.parser.parseQuery function is not thread safe
@@ -550,11 +1270,51 @@ def get_synonyms_from_scrappers(word, lang, depth, merge_graph=True) -> Graph:
     # ]
     # res = [t.result() for t in threads]
 
-    # thread safe version. Takes a while but it works
     res = []
-    for scrapper in scrappers[lang]:
-        logging.info(f"scrapping '{scrapper.website}' lang is '{lang}'")
-        res.append(scrapper.explore_reccursively(word, depth))
+    journal = CrawlJournal(resume) if resume else None
+    parsing_pool = ParsingPool(parse_workers) if parse_workers else None
+    previous_page_cache = SynonymsGetter.page_cache
+    if page_cache:
+        SynonymsGetter.page_cache = PageCache(path=page_cache)
+    try:
+        if shared_frontier:
+            logging.info(f"scrapping {len(scrappers[lang])} websites lang is '{lang}'")
+            res.append(
+                explore_scrappers(
+                    word,
+                    scrappers[lang],
+                    depth,
+                    fetch_workers,
+                    parsing_pool,
+                    journal,
+                    max_pages,
+                    max_seconds,
+                )
+            )
+        else:
+            for scrapper in scrappers[lang]:
+                logging.info(f"scrapping '{scrapper.website}' lang is '{lang}'")
+                res.append(
+                    _explore_scrapper(
+                        scrapper,
+                        word,
+                        depth,
+                        fetch_workers,
+                        parsing_pool,
+                        journal,
+                        max_pages,
+                        max_seconds,
+                    )
+                )
+    finally:
+        if parsing_pool:
+            parsing_pool.close()
+        if journal:
+            journal.close()
+        if page_cache:
+            logging.info(f"page cache: {SynonymsGetter.page_cache.stats()}")
+            SynonymsGetter.page_cache = previous_page_cache
+    logging.info(f"negative cache: {SynonymsGetter.negative_cache.stats()}")
     if merge_graph:
         main_graph = Graph()
         for graph in res:
@@ -0,0 +1,87 @@
+#!/bin/python3
+"""
+Benchmark of the approximate nearest neighbour index and of the quantized
+vectors against the exact search.
+
+The neighbours of random words of the model are searched exactly (one
+matrix-matrix product over the whole float32 vocabulary), in the index with
+an increasing number of clusters scanned and in the quantized vectors. The
+recall is the share of the exact neighbours found.
+
+    $ python bench_nlp_model.py ~/models/frWac.bin --words 1000 --n-probe 1 4 16 64 --dtype float16 int8
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from lexicons_builder.nlp_model_explorer._quantize import quantize_model
+from lexicons_builder.nlp_model_explorer._search import most_similar_batch
+from lexicons_builder.nlp_model_explorer.explorer import get_ann_index, get_model
+
+
+def recall(exact: dict, approximate: dict) -> float:
+    found = sum(
+        len({w for w, _ in exact[word]} & {w for w, _ in approximate[word]})
+        for word in exact
+    )
+    return found / max(1, sum(len(neighbours) for neighbours in exact.values()))
+
+
+def run(model_path, n_words, topn, n_probes, dtypes, seed):
+    start = time.perf_counter()
+    model = get_model(model_path)
+    print(f"{'load model':<20} {time.perf_counter() - start:8.2f}s")
+    start = time.perf_counter()
+    index = get_ann_index(model_path)
+    print(
+        f"{'load/build index':<20} {time.perf_counter() - start:8.2f}s "
+        f"{index.n_lists} clusters"
+    )
+
+    rng = np.random.default_rng(seed)
+    words = [
+        model.index_to_key[i]
+        for i in rng.choice(len(model.index_to_key), n_words, replace=False)
+    ]
+    start = time.perf_counter()
+    exact = most_similar_batch(model, words, topn=topn)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{'exact':<20} {elapsed:8.2f}s {n_words / elapsed:10.1f} words/s "
+        f"{model.vectors.nbytes / 1024 ** 2:10.1f} MiB"
+    )
+    for dtype in dtypes:
+        quantized = quantize_model(model, dtype)
+        start = time.perf_counter()
+        neighbours = most_similar_batch(quantized, words, topn=topn)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{dtype:<20} {elapsed:8.2f}s {n_words / elapsed:10.1f} words/s "
+            f"{quantized.vectors.nbytes / 1024 ** 2:10.1f} MiB "
+            f"recall@{topn} {recall(exact, neighbours):.3f}"
+        )
+    for n_probe in n_probes:
+        start = time.perf_counter()
+        approximate = index.most_similar(model, words, topn=topn, n_probe=n_probe)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{f'n_probe={n_probe}':<20} {elapsed:8.2f}s "
+            f"{n_words / elapsed:10.1f} words/s "
+            f"recall@{topn} {recall(exact, approximate):.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("model")
+    parser.add_argument("--words", type=int, default=1000)
+    parser.add_argument("--topn", type=int, default=10)
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument(
+        "--dtype", nargs="*", choices=("float16", "int8"), default=["float16", "int8"]
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.model, args.words, args.topn, args.n_probe, args.dtype, args.seed)
@@ -0,0 +1,76 @@
+#!/bin/python3
+"""
+Benchmark of the scrappers against the local replay server.
+
+The fixtures must have been recorded first (see replay.py). Each crawl mode
+is run on the same recorded pages with the same simulated latency, so the
+results can be compared from one run to another.
+
+    $ python bench_scrappers.py fr livre 2 --latency 0.1 --error-rate 0.02
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from replay import FIXTURES_DIR, ReplayServer, override_base_url
+
+from lexicons_builder.scrappers.scrappers import (
+    NegativeCache,
+    SynonymsGetter,
+    configure_rate_limiter,
+    get_synonyms_from_scrappers,
+    scrappers,
+)
+
+MODES = {
+    "recursive": {},
+    "threads": {"fetch_workers": 8},
+    "threads+processes": {"fetch_workers": 8, "parse_workers": 4},
+    "best-first 100 pages": {"fetch_workers": 8, "max_pages": 100},
+    "shared frontier": {"fetch_workers": 8, "shared_frontier": True},
+}
+
+
+def run(lang, word, depth, latency, error_rate, fixtures_dir, rate):
+    for name, kwargs in MODES.items():
+        # each mode starts without cache
+        SynonymsGetter.negative_cache = NegativeCache()
+        for scrapper in scrappers[lang]:
+            configure_rate_limiter(
+                scrapper.website, rate=rate, burst=rate, max_concurrency=8
+            )
+        with ReplayServer(fixtures_dir, latency, error_rate, retry_after=0) as server:
+            with override_base_url(server):
+                start = time.perf_counter()
+                g = get_synonyms_from_scrappers(word, lang, depth, **kwargs)
+                elapsed = time.perf_counter() - start
+        print(
+            f"{name:<20} {elapsed:8.2f}s {server.requests:6d} requests "
+            f"{server.requests / elapsed:8.1f} req/s {server.errors:4d} 429 "
+            f"{len(g):6d} words"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("lang")
+    parser.add_argument("word")
+    parser.add_argument("depth", type=int)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate", type=int, default=1000, help="requests per second")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    args = parser.parse_args()
+    run(
+        args.lang,
+        args.word,
+        args.depth,
+        args.latency,
+        args.error_rate,
+        args.fixtures,
+        args.rate,
+    )
@@ -0,0 +1,240 @@
+#!/bin/python3
+"""
+Record/replay harness for the scrappers.
+
+The :class:`Recorder` captures the responses of the websites into fixture
+archives (one json file per website). The :class:`ReplayServer` serves them
+from a local http server, with an optional latency and 429 injection, and
+:func:`override_base_url` points the scrappers to it.
+
+Record the fixtures (needs an internet connection)::
+
+    $ python replay.py record fr livre 2
+
+Then the crawls can be replayed offline, see bench_scrappers.py
+"""
+
+import http.server
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from requests.utils import requote_uri
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+
+# imported first to avoid the circular import between graphs and scrappers
+import lexicons_builder
+from lexicons_builder.scrappers.scrappers import (
+    SynonymsGetter,
+    get_synonyms_from_scrappers,
+)
+
+FIXTURES_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "data", "fixtures"
+)
+
+
+def _archive_name(website):
+    "file name of the archive of the website"
+    return urlsplit(website).netloc or website
+
+
+def _all_scrapper_classes(cls=SynonymsGetter):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _all_scrapper_classes(subclass)
+
+
+def _path(url, base_url):
+    "the path (and query) of the url relative to the base url"
+    return requote_uri(url)[len(requote_uri(base_url)) :]
+
+
+class Recorder:
+    """Capture the responses received by the scrappers and write them
+    to one archive per website when leaving the context
+
+    .. code:: python
+
+        >>> with Recorder("../data/fixtures"):
+        ...     get_synonyms_from_scrappers("livre", "fr", 2)
+
+    """
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+        self.archives = {}
+
+    def __enter__(self):
+        self._request = SynonymsGetter._request
+        recorder = self
+
+        def _recording_request(scrapper, url, headers=None):
+            r = recorder._request(scrapper, url, headers)
+            if r.status_code != 304:
+                recorder.add(scrapper, url, r)
+            return r
+
+        SynonymsGetter._request = _recording_request
+        return self
+
+    def __exit__(self, *args):
+        SynonymsGetter._request = self._request
+        self.save()
+
+    def add(self, scrapper, url, response):
+        name = _archive_name(scrapper.website)
+        archive = self.archives.setdefault(
+            name, {"website": scrapper.website, "pages": {}}
+        )
+        archive["pages"][_path(url, scrapper.base_url)] = {
+            "status": response.status_code,
+            "headers": {
+                k: v
+                for k, v in response.headers.items()
+                if k.lower() in ("content-type", "etag", "last-modified")
+            },
+            "body": response.text,
+        }
+
+    def save(self):
+        os.makedirs(self.fixtures_dir, exist_ok=True)
+        for name, archive in self.archives.items():
+            path = os.path.join(self.fixtures_dir, f"{name}.json")
+            if os.path.exists(path):
+                # keeping the pages recorded previously
+                with open(path, encoding="utf-8") as f:
+                    previous = json.load(f)
+                previous["pages"].update(archive["pages"])
+                archive = previous
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(archive, f, ensure_ascii=False, indent=1)
+            logging.info(f"{len(archive['pages'])} pages saved in '{path}'")
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server.replay
+        server.requests += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if server.error_rate and random.random() < server.error_rate:
+            server.errors += 1
+            self.send_response(429)
+            self.send_header("Retry-After", str(server.retry_after))
+            self.end_headers()
+            return
+        name, _, path = self.path[1:].partition("/")
+        page = server.archives.get(name, {}).get("pages", {}).get("/" + path)
+        if page is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = page["body"].encode("utf-8")
+        headers = {k.lower(): v for k, v in page["headers"].items()}
+        etag = headers.get("etag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        # the body is sent in utf-8 whatever the original encoding was
+        content_type = headers.get("content-type", "text/html").split(";")[0]
+        headers["content-type"] = f"{content_type}; charset=utf-8"
+        self.send_response(page["status"])
+        for header, value in headers.items():
+            self.send_header(header, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ReplayServer:
+    """Local http server replaying the fixture archives
+
+    The page ``<path>`` recorded on a website is served at
+    ``http://127.0.0.1:<port>/<website>/<path>``
+
+    Args:
+        fixtures_dir (str): the directory containing the archives
+        latency (float, optional): the number of seconds to wait before answering
+        error_rate (float, optional): the proportion of requests answered with a 429
+        retry_after (int, optional): the value of the Retry-After header of the 429 responses
+
+    .. code:: python
+
+        >>> with ReplayServer(latency=0.2, error_rate=0.05) as server:
+        ...     with override_base_url(server):
+        ...         g = get_synonyms_from_scrappers("livre", "fr", 2)
+
+    """
+
+    def __init__(
+        self, fixtures_dir=FIXTURES_DIR, latency=0.0, error_rate=0.0, retry_after=1
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.requests = 0
+        self.errors = 0
+        self.archives = {}
+        for file_name in os.listdir(fixtures_dir):
+            if file_name.endswith(".json"):
+                path = os.path.join(fixtures_dir, file_name)
+                with open(path, encoding="utf-8") as f:
+                    self.archives[file_name[: -len(".json")]] = json.load(f)
+        self._httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.replay = self
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@contextmanager
+def override_base_url(server):
+    """point all the scrappers to the server. The websites that were
+    not recorded answer with a 404, so nothing is sent to the real websites"""
+    previous = {}
+    for cls in _all_scrapper_classes():
+        website = getattr(cls, "website", None)
+        if website:
+            previous[cls] = cls.__dict__.get("base_url")
+            cls.base_url = f"{server.url}/{_archive_name(website)}"
+    try:
+        yield
+    finally:
+        for cls, base_url in previous.items():
+            if base_url is None:
+                del cls.base_url
+            else:
+                cls.base_url = base_url
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 5 or sys.argv[1] != "record":
+        print(__doc__)
+        sys.exit(1)
+    _, _, lang, word, depth = sys.argv
+    with Recorder():
+        get_synonyms_from_scrappers(word, lang, int(depth))
@@ -104,6 +104,50 @@ class TestGraph(unittest.TestCase):
         self.assertEqual(words, self.g.to_list())
         self.test_list_is_sorted()
 
+    def test_add_root_of_word(self):
+        self.g.add_root_word("car")
+        self.g.add_root_word("plane")
+        self.g.add_word("vehicle", 1, "synonym", "car")
+        self.g.add_root_of_word("vehicle", "car")
+        self.g.add_root_of_word("vehicle", "plane")
+        self.assertEqual(self.g.get_root_words_of("vehicle"), ["car", "plane"])
+        self.assertEqual(self.g.get_root_words_of("car"), [])
+        self.assertEqual(self.g.to_list(), ["car", "plane", "vehicle"])
+
+    def test_add_word_similarity(self):
+        self.g.add_root_word("car")
+        self.g.add_word("bus", 1, "synonym", "car", similarity=0.72)
+        self.g.add_word("train", 2, "synonym", "bus")
+        self.assertEqual(self.g.get_similarity("bus"), 0.72)
+        self.assertIsNone(self.g.get_similarity("train"))
+        # the best similarity is kept
+        self.g.add_word("train", 2, "synonym", "bus", similarity=0.5)
+        self.g.add_word("train", 1, "synonym", "car", similarity=0.6)
+        self.assertEqual(self.g.get_similarity("train"), 0.6)
+        self.assertEqual(self.g.to_list(), ["bus", "car", "train"])
+        # the similarities are stored on the relations
+        synonym = rdflib.URIRef("http://taxref.mnhn.fr/lod/property/isSynonymOf")
+        relations = {
+            (
+                self.g.value(statement, rdflib.RDF.object),
+                self.g.value(statement, self.g.base_local.similarity).toPython(),
+            )
+            for statement in self.g.subjects(
+                rdflib.RDF.subject, self.g.base_local.train
+            )
+            if self.g.value(statement, rdflib.RDF.predicate) == synonym
+        }
+        self.assertEqual(
+            relations,
+            {
+                (self.g.base_local.bus, 0.5),
+                (rdflib.URIRef(self.g.root_word_uri), 0.6),
+            },
+        )
+        self.assertIsNone(
+            self.g.value(self.g.base_local.train, self.g.base_local.similarity)
+        )
+
     def test_list_is_sorted(self):
         self.assertEqual(sorted(self.g.to_list()), self.g.to_list())
 
@@ -1,11 +1,47 @@
 #!/bin/python3
 import unittest
+import multiprocessing
 import os
+import shutil
 import sys
+import time
+from unittest.mock import patch
+
+import numpy as np
+import rdflib
+from gensim.models import KeyedVectors
+from rdflib.namespace import SKOS
 
 sys.path.insert(0, os.path.join("..", ".."))
 
 import lexicons_builder.nlp_model_explorer.explorer as exp
+import lexicons_builder.nlp_model_explorer._model_cache
+from lexicons_builder.nlp_model_explorer import _quantize
+from lexicons_builder.nlp_model_explorer._ann import IVFIndex
+from lexicons_builder.nlp_model_explorer._neighbour_cache import NeighbourCache
+
+
+def make_model(path, n_words=200, vector_size=16, binary=True, seed=0):
+    "write a small random word2vec model"
+    rng = np.random.default_rng(seed)
+    model = KeyedVectors(vector_size)
+    model.add_vectors(
+        [f"word{i}" for i in range(n_words)],
+        rng.standard_normal((n_words, vector_size)).astype(np.float32),
+    )
+    model.save_word2vec_format(path, binary=binary)
+    return model
+
+
+def assert_same_graph(test, g1, g2):
+    "the same words, relations and depths, and almost the same similarities"
+    similarity = g1.base_local.similarity
+    test.assertEqual(
+        {t for t in g1 if t[1] != similarity}, {t for t in g2 if t[1] != similarity}
+    )
+    similarities = {s: o.toPython() for s, _, o in g2.triples((None, similarity, None))}
+    for s, _, o in g1.triples((None, similarity, None)):
+        test.assertAlmostEqual(o.toPython(), similarities[s], places=4)
 
 
 class TestExplorer(unittest.TestCase):
@@ -49,4 +85,539 @@ class TestExplorer(unittest.TestCase):
             self.assertEqual(1, len(exp.explore_nlp_model(word, self.model_paths[0])))
 
 
+class TestModelCache(unittest.TestCase):
+
+    model_path = "_model.bin"
+    other_model_path = "_other_model.bin"
+
+    def setUp(self):
+        make_model(self.model_path)
+        make_model(self.other_model_path, seed=1)
+        exp.unload()
+
+    def tearDown(self):
+        exp.unload()
+        for path in (self.model_path, self.other_model_path):
+            os.remove(path)
+
+    def test_loaded_once(self):
+        with patch.object(exp, "_load_model", wraps=exp._load_model) as mocked_load:
+            g1 = exp.explore_nlp_model("word0", self.model_path, 1)
+            g2 = exp.explore_nlp_model("word1", self.model_path, 1)
+            self.assertEqual(mocked_load.call_count, 1)
+            self.assertIn(self.model_path, exp.model_cache)
+            # the file changed
+            time.sleep(0.01)
+            make_model(self.model_path, seed=2)
+            exp.explore_nlp_model("word0", self.model_path, 1)
+            self.assertEqual(mocked_load.call_count, 2)
+        self.assertEqual(len(exp.model_cache), 1)
+        self.assertEqual(len(g1.to_list()), 11)
+        self.assertEqual(len(g2.to_list()), 11)
+
+    def test_preload_unload(self):
+        exp.preload(self.model_path, self.other_model_path)
+        self.assertEqual(len(exp.model_cache), 2)
+        exp.unload(self.model_path)
+        self.assertNotIn(self.model_path, exp.model_cache)
+        self.assertIn(self.other_model_path, exp.model_cache)
+
+    def test_eviction(self):
+        model_nbytes = lexicons_builder.nlp_model_explorer._model_cache.model_nbytes
+        cache = lexicons_builder.nlp_model_explorer._model_cache.ModelCache(
+            max_bytes=int(1.5 * model_nbytes(exp._load_model(self.model_path)))
+        )
+        cache.get(self.model_path, exp._load_model)
+        cache.get(self.other_model_path, exp._load_model)
+        # the least recently used model was unloaded
+        self.assertNotIn(self.model_path, cache)
+        self.assertIn(self.other_model_path, cache)
+
+
+class TestNativeFormat(unittest.TestCase):
+
+    model_path = "_model.bin"
+
+    def setUp(self):
+        make_model(self.model_path)
+
+    def tearDown(self):
+        exp.unload()
+        for path in os.listdir("."):
+            if path.startswith("_model."):
+                os.remove(path)
+
+    def test_convert(self):
+        native_path = exp.convert_model(self.model_path)
+        self.assertEqual(native_path, "_model.kv")
+        model = exp._load_model(native_path)
+        self.assertIsInstance(model.vectors, np.memmap)
+        self.assertIsInstance(model.norms, np.memmap)
+        self.assertEqual(
+            model.most_similar("word0"),
+            exp._load_model(self.model_path).most_similar("word0"),
+        )
+        self.assertRaises(ValueError, exp.convert_model, native_path)
+
+    def test_same_graph(self):
+        g = exp.explore_nlp_model("word0", self.model_path, 2)
+        native_path = exp.convert_model(self.model_path)
+        g_native = exp.explore_nlp_model("word0", native_path, 2)
+        self.assertEqual(g.to_list(), g_native.to_list())
+
+
+class TestExploreByLevel(unittest.TestCase):
+
+    model_path = "_model.bin"
+
+    def setUp(self):
+        self.model = make_model(self.model_path)
+
+    def tearDown(self):
+        exp.unload()
+        os.remove(self.model_path)
+
+    def test_most_similar_batch(self):
+        words = ["word0", "word1", "word42"]
+        # small blocks: one word per block
+        for block_bytes in (1, 2**20):
+            neighbours = exp.most_similar_batch(
+                self.model, words, topn=5, block_bytes=block_bytes
+            )
+            for word in words:
+                expected = self.model.most_similar(word, topn=5)
+                self.assertEqual(
+                    [w for w, _ in neighbours[word]], [w for w, _ in expected]
+                )
+                np.testing.assert_allclose(
+                    [s for _, s in neighbours[word]],
+                    [s for _, s in expected],
+                    rtol=1e-5,
+                )
+
+    def test_same_graph(self):
+        for depth in (1, 2, 3):
+            g = exp.explore_nlp_model("word0", self.model_path, depth)
+            g_by_level = exp.explore_nlp_model_by_level("word0", self.model_path, depth)
+            assert_same_graph(self, g, g_by_level)
+
+    def test_word_not_in_model(self):
+        g = exp.explore_nlp_model_by_level("unknown", self.model_path, 2)
+        self.assertEqual(g.to_list(), ["unknown"])
+
+
+class TestAnnIndex(unittest.TestCase):
+
+    model_path = "_model.bin"
+
+    def setUp(self):
+        self.model = make_model(self.model_path)
+
+    def tearDown(self):
+        exp.unload()
+        os.remove(self.model_path)
+        for path in os.listdir("."):
+            if path.startswith(self.model_path) and path.endswith(".ivf"):
+                shutil.rmtree(path)
+
+    def test_build(self):
+        index = IVFIndex.build(self.model, n_lists=8)
+        self.assertEqual(index.n_lists, 8)
+        self.assertEqual(index.offsets[-1], 200)
+        # each word is in one cluster
+        self.assertEqual(sorted(index.ids), list(range(200)))
+        np.testing.assert_allclose(np.linalg.norm(index.vectors, axis=1), 1, rtol=1e-5)
+
+    def test_save_load(self):
+        IVFIndex.build(self.model, n_lists=8).save(self.model_path + ".ivf")
+        index = IVFIndex.load(self.model_path + ".ivf")
+        self.assertIsInstance(index.vectors, np.memmap)
+        self.assertEqual(index.meta, {"n_words": 200})
+
+    def test_recall(self):
+        index = IVFIndex.build(self.model, n_lists=8)
+        words = [f"word{i}" for i in range(20)]
+        # all the clusters scanned: exact search
+        neighbours = index.most_similar(self.model, words, topn=5, n_probe=8)
+        for word in words:
+            self.assertEqual(
+                [w for w, _ in neighbours[word]],
+                [w for w, _ in self.model.most_similar(word, topn=5)],
+            )
+        neighbours = index.most_similar(self.model, words, topn=5, n_probe=1)
+        for word in words:
+            self.assertLessEqual(len(neighbours[word]), 5)
+            self.assertNotIn(word, [w for w, _ in neighbours[word]])
+
+    def test_cache(self):
+        index = exp.get_ann_index(self.model_path)
+        self.assertIs(exp.get_ann_index(self.model_path), index)
+        # the index is not kept with the models
+        self.assertEqual(len(exp.model_cache), 1)
+        index_8 = exp.get_ann_index(self.model_path, n_lists=8)
+        self.assertIsNot(index_8, index)
+        self.assertEqual(index_8.n_lists, 8)
+        self.assertIs(exp.get_ann_index(self.model_path, n_lists=8), index_8)
+        exp.unload(self.model_path)
+        self.assertIsNot(exp.get_ann_index(self.model_path), index)
+
+    def test_explore(self):
+        n_lists = exp.get_ann_index(self.model_path).n_lists
+        self.assertTrue(os.path.isdir(self.model_path + ".ivf"))
+        g = exp.explore_nlp_model("word0", self.model_path, 2)
+        for explore in (exp.explore_nlp_model, exp.explore_nlp_model_by_level):
+            g_ann = explore("word0", self.model_path, 2, n_probe=n_lists)
+            assert_same_graph(self, g, g_ann)
+            g_ann = explore("word0", self.model_path, 2, n_probe=1)
+            self.assertIn("word0", g_ann.to_list())
+
+
+class TestVocabularyFilter(unittest.TestCase):
+
+    model_path = "_model.bin"
+
+    def setUp(self):
+        self.model = make_model(self.model_path)
+
+    def tearDown(self):
+        exp.unload()
+        for path in os.listdir("."):
+            if path.startswith("_model."):
+                shutil.rmtree(path) if os.path.isdir(path) else os.remove(path)
+
+    def test_limit(self):
+        model = exp.get_model(self.model_path, limit=50)
+        self.assertEqual(model.index_to_key, [f"word{i}" for i in range(50)])
+        np.testing.assert_array_equal(model["word3"], self.model["word3"])
+        # the full model is another entry of the cache
+        self.assertEqual(len(exp.get_model(self.model_path)), 200)
+        self.assertIs(exp.get_model(self.model_path, limit=50), model)
+
+    def test_allow(self):
+        model = exp.get_model(self.model_path, allow=r"word1\d*")
+        self.assertEqual(len(model), 111)
+        g = exp.explore_nlp_model_by_level(
+            "word1", self.model_path, 2, allow=r"word1\d*"
+        )
+        self.assertTrue(all(w.startswith("word1") for w in g.to_list()))
+        self.assertEqual(
+            g.to_list(),
+            exp.explore_nlp_model(
+                "word1", self.model_path, 2, allow=r"word1\d*"
+            ).to_list(),
+        )
+
+    def test_min_count(self):
+        # the word2vec files do not contain the counts
+        self.assertEqual(len(exp.get_model(self.model_path, min_count=150)), 200)
+        for i, word in enumerate(self.model.index_to_key):
+            self.model.set_vecattr(word, "count", 2 * i)
+        self.model.save("_model.kv")
+        model = exp.get_model("_model.kv", min_count=100)
+        self.assertEqual(len(model), 150)
+        self.assertEqual(model.get_vecattr("word199", "count"), 398)
+
+    def test_ann_index(self):
+        index = exp.get_ann_index(self.model_path, limit=50)
+        self.assertEqual(len(index), 50)
+        self.assertEqual(len(exp.get_ann_index(self.model_path)), 200)
+        self.assertEqual(len([p for p in os.listdir(".") if p.endswith(".ivf")]), 2)
+
+
+class TestQuantize(unittest.TestCase):
+
+    model_path = "_model.bin"
+
+    def setUp(self):
+        self.model = make_model(self.model_path)
+
+    def tearDown(self):
+        exp.unload()
+        for path in os.listdir("."):
+            if path.startswith("_model."):
+                os.remove(path)
+
+    def test_quantize(self):
+        normed = self.model.get_normed_vectors()
+        for dtype, tolerance in (("float16", 1e-3), ("int8", 2e-2)):
+            codes, scales = _quantize.quantize(self.model.vectors, dtype, block_rows=64)
+            self.assertEqual(codes.dtype, np.dtype(dtype))
+            np.testing.assert_allclose(
+                _quantize.dequantize(codes, scales), normed, atol=tolerance
+            )
+        self.assertRaises(ValueError, _quantize.quantize, self.model.vectors, "int4")
+
+    def test_recall(self):
+        words = [f"word{i}" for i in range(50)]
+        exact = exp.most_similar_batch(self.model, words)
+        for dtype, ratio in (("float16", 2), ("int8", 4)):
+            quantized = _quantize.quantize_model(self.model, dtype)
+            self.assertEqual(
+                self.model.vectors.nbytes, ratio * quantized.vectors.nbytes
+            )
+            neighbours = exp.most_similar_batch(quantized, words, block_bytes=1)
+            found = sum(
+                len({w for w, _ in exact[word]} & {w for w, _ in neighbours[word]})
+                for word in words
+            )
+            self.assertGreater(found / (10 * len(words)), 0.9)
+
+    def test_convert(self):
+        path = exp.convert_model(self.model_path, dtype="int8")
+        self.assertEqual(path, "_model.int8.kv")
+        model = exp.get_model(path)
+        self.assertEqual(model.vectors.dtype, np.int8)
+        self.assertIsInstance(model.scales, np.memmap)
+        g = exp.explore_nlp_model("word0", path, 2)
+        assert_same_graph(self, g, exp.explore_nlp_model_by_level("word0", path, 2))
+        self.assertEqual(len(exp.get_model(path, limit=20).scales), 20)
+
+
+class TestNeighbourCache(unittest.TestCase):
+
+    model_path = "_model.bin"
+    cache_path = "_neighbours.sqlite"
+
+    def setUp(self):
+        self.model = make_model(self.model_path)
+
+    def tearDown(self):
+        exp.unload()
+        for cache in exp._neighbour_caches.values():
+            cache.close()
+        exp._neighbour_caches.clear()
+        for path in os.listdir("."):
+            if path.startswith(("_model.", "_neighbours.")):
+                os.remove(path)
+
+    def test_add_get(self):
+        cache = NeighbourCache(self.cache_path)
+        neighbours = exp.most_similar_batch(self.model, ["word0", "word1"])
+        cache.add(self.model, 10, neighbours)
+        self.assertEqual(len(cache), 2)
+        found = cache.get(self.model, ["word0", "word1", "word2"], 10)
+        self.assertEqual(set(found), {"word0", "word1"})
+        self.assertEqual(
+            [w for w, _ in found["word0"]], [w for w, _ in neighbours["word0"]]
+        )
+        self.assertEqual(cache.get(self.model, ["word0"], 5), {})
+        # another model
+        other = make_model("_model.other.bin", seed=1)
+        self.assertEqual(cache.get(other, ["word0"], 10), {})
+        self.assertEqual(cache.stats()["hits"], 2)
+
+    def test_explore(self):
+        g = exp.explore_nlp_model("word0", self.model_path, 2)
+        for explore in (exp.explore_nlp_model, exp.explore_nlp_model_by_level):
+            g_cached = explore(
+                "word0", self.model_path, 2, neighbour_cache=self.cache_path
+            )
+            assert_same_graph(self, g, g_cached)
+        cache = exp.get_neighbour_cache(self.cache_path)
+        self.assertGreater(cache.stats()["hits"], 0)
+        # the cache is kept from one process to another
+        self.assertGreater(len(NeighbourCache(self.cache_path)), 1)
+
+    def test_precompute(self):
+        self.assertEqual(
+            exp.precompute_neighbours(self.model_path, self.cache_path, 50), 50
+        )
+        self.assertEqual(
+            exp.precompute_neighbours(self.model_path, self.cache_path, 60), 10
+        )
+        cache = exp.get_neighbour_cache(self.cache_path)
+        with patch.object(exp, "most_similar_batch", side_effect=AssertionError):
+            # all the neighbours are read from the cache
+            exp.explore_nlp_model_by_level(
+                "word0", self.model_path, 1, neighbour_cache=self.cache_path
+            )
+        self.assertEqual(len(cache), 60)
+
+
+class TestThresholds(unittest.TestCase):
+
+    model_path = "_model.bin"
+
+    def setUp(self):
+        self.model = make_model(self.model_path)
+
+    def tearDown(self):
+        exp.unload()
+        os.remove(self.model_path)
+
+    def test_topn(self):
+        g = exp.explore_nlp_model_by_level("word0", self.model_path, 1, topn=3)
+        self.assertEqual(len(g), 4)
+
+    def test_similarities(self):
+        g = exp.explore_nlp_model("word0", self.model_path, 1)
+        for word, similarity in self.model.most_similar("word0"):
+            self.assertAlmostEqual(g.get_similarity(word), similarity, places=5)
+
+    def test_min_similarity(self):
+        for explore in (exp.explore_nlp_model, exp.explore_nlp_model_by_level):
+            g = explore("word0", self.model_path, 3, min_similarity=0.4)
+            words = [w for w in g.to_list() if w != "word0"]
+            self.assertTrue(words)
+            self.assertTrue(all(g.get_similarity(w) >= 0.4 for w in words))
+            self.assertLess(len(g), len(explore("word0", self.model_path, 3)))
+
+    def test_decay(self):
+        synonym = rdflib.URIRef("http://taxref.mnhn.fr/lod/property/isSynonymOf")
+        for explore in (exp.explore_nlp_model, exp.explore_nlp_model_by_level):
+            g = explore("word0", self.model_path, 3)
+            # no minimum similarity is needed
+            g_decay = explore("word0", self.model_path, 3, decay=0.1)
+            self.assertLess(len(g_decay), len(g))
+            for word in g_decay.to_list():
+                parent = g_decay.value(g_decay.base_local[word], synonym)
+                if parent is None:
+                    continue
+                parent_similarity = g_decay.get_similarity(
+                    str(g_decay.value(parent, SKOS.prefLabel))
+                )
+                if parent_similarity is not None:
+                    self.assertGreaterEqual(
+                        g_decay.get_similarity(word), 0.9 * parent_similarity - 1e-6
+                    )
+        self.assertRaises(
+            ValueError, exp.explore_nlp_model, "word0", self.model_path, 2, decay=1.5
+        )
+
+    def test_same_graph(self):
+        for kwargs in (
+            {"topn": 4},
+            {"min_similarity": 0.3},
+            {"min_similarity": 0.2, "decay": 0.5, "topn": 20},
+            {"decay": 0.1},
+            {"decay": 0.3, "topn": 20},
+        ):
+            g = exp.explore_nlp_model("word0", self.model_path, 3, **kwargs)
+            g_by_level = exp.explore_nlp_model_by_level(
+                "word0", self.model_path, 3, **kwargs
+            )
+            assert_same_graph(self, g, g_by_level)
+
+
+def explore_in_worker(word, model_path):
+    # the model is attached, not loaded
+    with patch.object(exp, "_load_model", side_effect=AssertionError):
+        g = exp.explore_nlp_model_by_level(word, model_path, 2)
+    return g.to_list(), type(exp.get_model(model_path)).__name__
+
+
+class TestSharedModel(unittest.TestCase):
+
+    model_path = "_model.bin"
+    shared_dir = "_shared"
+
+    def setUp(self):
+        self.model = make_model(self.model_path)
+        os.mkdir(self.shared_dir)
+
+    def tearDown(self):
+        exp.unload()
+        os.remove(self.model_path)
+        shutil.rmtree(self.shared_dir)
+
+    def test_share_attach(self):
+        name = exp.share_model(self.model_path, directory=self.shared_dir)
+        self.assertEqual(
+            exp.share_model(self.model_path, directory=self.shared_dir), name
+        )
+        self.assertEqual(len(os.listdir(self.shared_dir)), 1)
+        exp.unload()
+        model = exp.attach_model(name, directory=self.shared_dir)
+        self.assertIs(exp.get_model(self.model_path), model)
+        self.assertIsInstance(model.vectors, np.memmap)
+        self.assertEqual(list(model.index_to_key), self.model.index_to_key)
+        self.assertEqual(model.key_to_index["word42"], 42)
+        self.assertIn("word199", model)
+        self.assertNotIn("word200", model)
+        self.assertNotIn(0, model)
+        exp.unshare_model(name, directory=self.shared_dir)
+        self.assertEqual(os.listdir(self.shared_dir), [])
+
+    def test_same_graph(self):
+        g = exp.explore_nlp_model_by_level("word0", self.model_path, 2)
+        name = exp.share_model(self.model_path, directory=self.shared_dir)
+        exp.unload()
+        exp.attach_model(name, directory=self.shared_dir)
+        assert_same_graph(
+            self, g, exp.explore_nlp_model_by_level("word0", self.model_path, 2)
+        )
+        assert_same_graph(self, g, exp.explore_nlp_model("word0", self.model_path, 2))
+
+    def test_process_pool(self):
+        name = exp.share_model(self.model_path, directory=self.shared_dir)
+        expected = exp.explore_nlp_model_by_level("word3", self.model_path, 2).to_list()
+        exp.unload()
+        with multiprocessing.get_context("fork").Pool(
+            2, initializer=exp.attach_model, initargs=(name, self.shared_dir)
+        ) as pool:
+            results = pool.starmap(explore_in_worker, [("word3", self.model_path)] * 4)
+        for words, model_type in results:
+            self.assertEqual(words, expected)
+            self.assertEqual(model_type, "SharedKeyedVectors")
+
+
+class TestModelFormat(unittest.TestCase):
+
+    model_path = "_model"
+
+    def tearDown(self):
+        exp.unload()
+        for path in os.listdir("."):
+            if path.startswith("_model"):
+                os.remove(path)
+
+    def assertLoads(self, expected_format):
+        self.assertEqual(
+            exp._formats.sniff_model_format(self.model_path), expected_format
+        )
+        model = exp._load_model(self.model_path)
+        self.assertEqual(len(model), 200)
+        self.assertEqual(model.index_to_key[0], "word0")
+
+    def test_word2vec_binary(self):
+        make_model(self.model_path, binary=True)
+        self.assertLoads("word2vec_binary")
+
+    def test_word2vec_text(self):
+        make_model(self.model_path, binary=False)
+        self.assertLoads("word2vec_text")
+
+    def test_word2vec_text_no_header(self):
+        make_model(self.model_path, binary=False)
+        with open(self.model_path) as f:
+            lines = f.readlines()[1:]
+        with open(self.model_path, "w") as f:
+            f.writelines(lines)
+        self.assertLoads("word2vec_text_no_header")
+
+    def test_compressed(self):
+        make_model(self.model_path + ".gz", binary=False)
+        self.model_path += ".gz"
+        self.assertLoads("word2vec_text")
+
+    def test_native(self):
+        make_model(self.model_path, binary=True)
+        self.model_path = exp.convert_model(self.model_path, "_model.kv")
+        self.assertLoads("native")
+
+    def test_fasttext(self):
+        from gensim.models.fasttext import FastText, save_facebook_model
+
+        sentences = [[f"word{i}" for i in range(j, j + 10)] for j in range(0, 200, 5)]
+        model = FastText(sentences, vector_size=8, min_count=1, epochs=1)
+        save_facebook_model(model, self.model_path)
+        self.assertEqual(exp._formats.sniff_model_format(self.model_path), "fasttext")
+        self.assertIn("word0", exp._load_model(self.model_path))
+
+    def test_unsupported(self):
+        with open(self.model_path, "w") as f:
+            f.write("<html>not a model</html>")
+        self.assertRaises(ValueError, exp._load_model, self.model_path)
+
+
 unittest.main()
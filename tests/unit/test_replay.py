@@ -0,0 +1,54 @@
+#!/bin/python3
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.join("..", "benchmarks"))
+
+from replay import ReplayServer, override_base_url
+
+from lexicons_builder.scrappers.scrappers import (
+    NegativeCache,
+    SynonymsGetterCrisco2,
+    configure_rate_limiter,
+)
+
+
+class TestReplayServer(unittest.TestCase):
+
+    fixtures_dir = os.path.join("..", "data", "fixtures")
+
+    def setUp(self):
+        self.scrapper = SynonymsGetterCrisco2()
+        self.scrapper.negative_cache = NegativeCache()
+        configure_rate_limiter(self.scrapper.website, rate=1000, burst=100)
+
+    def test_override_base_url(self):
+        with ReplayServer(self.fixtures_dir) as server:
+            with override_base_url(server):
+                self.assertTrue(self.scrapper.base_url.startswith(server.url))
+        self.assertEqual(self.scrapper.base_url, "https://crisco2.unicaen.fr")
+
+    def test_replay(self):
+        with ReplayServer(self.fixtures_dir) as server:
+            with override_base_url(server):
+                g = self.scrapper.explore_reccursively("livre", 2)
+                self.assertEqual(
+                    sorted(self.scrapper._get_results_from_website("livre")),
+                    ["bouquin", "ouvrage", "volume"],
+                )
+                self.assertEqual(
+                    self.scrapper._get_results_from_website("not_recorded"), []
+                )
+        self.assertIn("travail", g)
+        self.assertNotIn("labeur", g)
+
+    def test_429_injection(self):
+        self.scrapper.max_retries = 0
+        with ReplayServer(self.fixtures_dir, error_rate=1) as server:
+            with override_base_url(server):
+                self.assertEqual(self.scrapper._get_results_from_website("livre"), [])
+        self.assertEqual(server.errors, 1)
+
+
+unittest.main()
@@ -1,15 +1,38 @@
 #!/bin/python3
+import asyncio
+import io
 import unittest
 import os
 import re
 import sys
-from unittest.mock import patch
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest.mock import Mock, patch
 
+import requests
 from bs4 import BeautifulSoup
 
 sys.path.insert(0, os.path.join("..", "..", "lexicons_builder"))
 
 import scrappers.scrappers  # as exp
+import scrappers._cache
+import scrappers._frontier
+import scrappers._journal
+import scrappers._metrics
+import scrappers._normalize
+import scrappers._rate_limiter
+import scrappers._registry
+
+
+def fake_response(status_code=200, body="", headers=None):
+    "a streamed response of the body"
+    r = requests.Response()
+    r.status_code = status_code
+    r.headers.update(headers or {"Content-Type": "text/html; charset=utf-8"})
+    r.raw = io.BytesIO(body.encode() if isinstance(body, str) else body)
+    r.encoding = "utf-8"
+    r.url = "http://fakeurl.com"
+    return r
 
 
 class TestSynonymsGetter(unittest.TestCase):
@@ -49,5 +72,602 @@ class TestSynonymsGetter(unittest.TestCase):
                 self.scrapper.download_and_parse_page("fakeurl.com"),
             )
 
+    def test_download_and_parse_page_retry_after(self):
+        limiter = scrappers.scrappers.configure_rate_limiter(
+            str(self.scrapper), rate=100, burst=5, backoff_max=0.01
+        )
+        with patch("scrappers.scrappers.requests.get") as mocked_request, patch.object(
+            limiter, "backoff", wraps=limiter.backoff
+        ) as mocked_backoff:
+            too_many = fake_response(429, headers={"Retry-After": "3"})
+            ok = fake_response(200, "<p>ok</p>")
+            mocked_request.side_effect = [too_many, ok]
+            soup = self.scrapper.download_and_parse_page("fakeurl.com")
+            self.assertEqual(mocked_request.call_count, 2)
+            mocked_backoff.assert_called_once_with(0, "3")
+            self.assertEqual(soup.text, "ok")
+
+    def test_missing_pages_are_not_errors(self):
+        limiter = scrappers.scrappers.configure_rate_limiter(
+            str(self.scrapper), rate=1000, burst=100, max_concurrency=4
+        )
+        with patch("scrappers.scrappers.requests.get") as mocked_request:
+            mocked_request.side_effect = lambda *a, **kw: fake_response(404)
+            for _ in range(10):
+                self.scrapper._request("fakeurl.com")
+            self.assertEqual(limiter.concurrency, 4)
+            mocked_request.side_effect = lambda *a, **kw: fake_response(500)
+            for _ in range(10):
+                self.scrapper._request("fakeurl.com")
+            self.assertEqual(limiter.concurrency, 1)
+
+
+class TestParseOnly(unittest.TestCase):
+
+    page = """<html><body><ul><li><a href="/des/synonymes/lire">lire</a></li>
+    <li><a href="/des/antonymes/ignorer">ignorer</a></li></ul>
+    <a href="/des/synonymes/bouquin">bouquin</a></body></html>"""
+
+    def setUp(self):
+        self.scrapper = scrappers.scrappers.SynonymsGetterCrisco2()
+        scrappers.scrappers.configure_rate_limiter(
+            self.scrapper.website, rate=100, burst=5
+        )
+
+    def test_same_results_as_full_parsing(self):
+        with patch("scrappers.scrappers.requests.get") as mocked_request:
+            mocked_request.side_effect = lambda *a, **kw: fake_response(200, self.page)
+            strained = self.scrapper._get_results_from_website("livre")
+            self.scrapper.parse_only = None
+            self.scrapper.html_parser = "html.parser"
+            full = self.scrapper._get_results_from_website("livre")
+        self.assertEqual(sorted(strained), ["bouquin", "lire"])
+        self.assertEqual(sorted(strained), sorted(full))
+
+
+class TestExploreByLevel(unittest.TestCase):
+
+    pages = {
+        "livre": ["bouquin", "ouvrage"],
+        "bouquin": ["livre", "bouquiner"],
+        "ouvrage": ["oeuvre", "livre"],
+    }
+
+    def fake_get(self, url, **kwargs):
+        word = url.rsplit("/", 1)[-1]
+        links = "".join(
+            f'<a href="/des/synonymes/{w}">{w}</a>' for w in self.pages.get(word, [])
+        )
+        text = f"<html>{links}</html>"
+        return fake_response(200, text)
+
+    def setUp(self):
+        self.scrapper = scrappers.scrappers.SynonymsGetterCrisco2()
+        scrappers.scrappers.configure_rate_limiter(
+            self.scrapper.website, rate=1000, burst=100
+        )
+
+    def test_same_words_as_explore_reccursively(self):
+        with patch("scrappers.scrappers.requests.get", side_effect=self.fake_get):
+            expected = self.scrapper.explore_reccursively("livre", 2).to_list()
+            with scrappers.scrappers.ParsingPool(2) as pool:
+                g = self.scrapper.explore_by_level("livre", 2, 4, pool)
+        self.assertEqual(g.to_list(), expected)
+        self.assertEqual(
+            expected, ["bouquin", "bouquiner", "livre", "oeuvre", "ouvrage"]
+        )
+
+    def test_download_does_not_wait_for_the_parsing(self):
+        self.scrapper.negative_cache = scrappers._cache.NegativeCache()
+        parsed = Future()
+        pool = Mock()
+        pool.submit.return_value = parsed
+        with patch("scrappers.scrappers.requests.get", side_effect=self.fake_get):
+            future = self.scrapper._submit_crawl_results("livre", None, pool)
+        self.assertFalse(future.done())
+        parsed.set_result((["bouquin"], 0.01))
+        self.assertEqual(future.result(), ["bouquin"])
+
+    def test_one_fetch_worker(self):
+        with patch("scrappers.scrappers.requests.get", side_effect=self.fake_get):
+            expected = self.scrapper.explore_reccursively("livre", 2).to_list()
+            with scrappers.scrappers.ParsingPool(2, max_pending=1) as pool:
+                g = self.scrapper.explore_by_level("livre", 2, 1, pool)
+        self.assertEqual(g.to_list(), expected)
+
+
+class TestExploreBestFirst(TestExploreByLevel):
+    def setUp(self):
+        super().setUp()
+        self.scrapper.negative_cache = scrappers._cache.NegativeCache()
+
+    def test_same_words_as_explore_by_level(self):
+        with patch("scrappers.scrappers.requests.get", side_effect=self.fake_get):
+            expected = self.scrapper.explore_by_level("livre", 3).to_list()
+            g = self.scrapper.explore_best_first("livre", 3, fetch_workers=2)
+        self.assertEqual(g.to_list(), expected)
+
+    def test_max_pages(self):
+        with patch(
+            "scrappers.scrappers.requests.get", side_effect=self.fake_get
+        ) as mocked_request:
+            g = self.scrapper.explore_best_first("livre", 3, max_pages=2)
+            self.assertEqual(mocked_request.call_count, 2)
+        self.assertIsInstance(g, scrappers.scrappers.Graph)
+        self.assertIn("bouquin", g)
+
+    def test_frontier_priority(self):
+        frontier = scrappers._frontier.BestFirstFrontier()
+        frontier.push("livre", 0)
+        self.assertEqual(frontier.pop(), ("livre", 0))
+        frontier.push("bouquin", 1, "livre", "a")
+        frontier.push("ouvrage", 1, "livre", "a")
+        frontier.push("ouvrage", 2, "bouquin", "a")
+        # already expanded
+        frontier.push("livre", 2, "ouvrage", "a")
+        self.assertEqual(len(frontier), 2)
+        self.assertEqual(frontier.pop_many(5), [("ouvrage", 1), ("bouquin", 1)])
+        self.assertRaises(IndexError, frontier.pop)
+
+
+class TestExploreScrappers(TestExploreByLevel):
+    class OtherWebsite(scrappers.scrappers.SynonymsGetterCrisco2):
+        website = "other.website"
+        base_url = "https://other.website"
+
+    def setUp(self):
+        super().setUp()
+        self.scrapper.negative_cache = scrappers._cache.NegativeCache()
+        self.other = self.OtherWebsite()
+        self.other.negative_cache = self.scrapper.negative_cache
+        scrappers.scrappers.configure_rate_limiter(
+            self.other.website, rate=1000, burst=100
+        )
+
+    def test_shared_frontier(self):
+        with patch(
+            "scrappers.scrappers.requests.get", side_effect=self.fake_get
+        ) as mocked_request:
+            expected = self.scrapper.explore_by_level("livre", 2).to_list()
+            mocked_request.reset_mock()
+            g = scrappers.scrappers.explore_scrappers(
+                "livre", [self.scrapper, self.other], 2, fetch_workers=4
+            )
+            # 3 words expanded (livre, bouquin, ouvrage) on 2 websites
+            self.assertEqual(mocked_request.call_count, 6)
+        self.assertEqual(g.to_list(), expected)
+        websites = {
+            str(o)
+            for s, _, o in g.triples((None, g.base_local.comesFrom, None))
+            if s.endswith("bouquin")
+        }
+        self.assertEqual(websites, {self.scrapper.website, self.other.website})
+
+    def test_several_root_words(self):
+        with patch(
+            "scrappers.scrappers.requests.get", side_effect=self.fake_get
+        ) as mocked_request:
+            expected = set(self.scrapper.explore_by_level("livre", 2).to_list())
+            expected |= set(self.scrapper.explore_by_level("ouvrage", 2).to_list())
+            self.assertEqual(mocked_request.call_count, 6)
+            mocked_request.reset_mock()
+            self.scrapper.negative_cache.clear()
+            g = scrappers.scrappers.explore_scrappers(
+                ["livre", "ouvrage"], [self.scrapper], 2
+            )
+            # livre, ouvrage, bouquin and oeuvre
+            self.assertEqual(mocked_request.call_count, 4)
+        self.assertEqual(g.to_list(), sorted(expected))
+        self.assertEqual(g.get_root_words_of("bouquin"), ["livre", "ouvrage"])
+        self.assertEqual(g.get_root_words_of("bouquiner"), ["livre"])
+        self.assertEqual(g.get_root_words_of("oeuvre"), ["livre", "ouvrage"])
+
+
+class TestCrawlMetrics(TestExploreByLevel):
+    def setUp(self):
+        super().setUp()
+        self.scrapper.negative_cache = scrappers._cache.NegativeCache()
+        self.scrapper.metrics = scrappers._metrics.CrawlMetrics()
+
+    def test_histogram(self):
+        h = scrappers._metrics.Histogram((1, 2, 5))
+        for v in (0.5, 1.5, 1.8, 10):
+            h.observe(v)
+        d = h.to_dict()
+        self.assertEqual(d["buckets"], {"1": 1, "2": 2, "5": 0, "+inf": 1})
+        self.assertEqual((d["count"], d["min"], d["max"]), (4, 0.5, 10))
+        self.assertEqual(d["p50"], 2)
+
+    def test_summary(self):
+        observations = []
+        self.scrapper.metrics.add_callback(
+            lambda website, name, value: observations.append((website, name))
+        )
+        with patch("scrappers.scrappers.requests.get", side_effect=self.fake_get):
+            self.scrapper.explore_by_level("livre", 2)
+            # a page without synonyms, then a known miss
+            self.scrapper._get_results_from_website("bouquiner")
+            self.scrapper._get_results_from_website("bouquiner")
+        summary = self.scrapper.metrics.summary()[self.scrapper.website]
+        self.assertEqual(summary["requests"], 4)
+        self.assertEqual(summary["status_codes"], {"200": 4})
+        self.assertEqual(summary["pages"], 4)
+        self.assertEqual(summary["words"], 6)
+        self.assertEqual(summary["cache_hit_ratio"], 1 / 5)
+        self.assertEqual(summary["latency"]["count"], 4)
+        self.assertIn((self.scrapper.website, "latency"), observations)
+        self.assertIn((self.scrapper.website, "cache_hit"), observations)
+        self.assertEqual(self.scrapper.metrics.bottleneck(), self.scrapper.website)
+        self.scrapper.metrics.reset()
+        self.assertEqual(self.scrapper.metrics.summary(), {})
+
+
+class TestCrawlJournal(TestExploreByLevel):
+
+    journal_path = "_journal.jsonl"
+
+    def setUp(self):
+        super().setUp()
+        self.scrapper.negative_cache = scrappers._cache.NegativeCache()
+        self.urls = []
+
+    def tearDown(self):
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def crashing_get(self, url, **kwargs):
+        if len(self.urls) == 2:
+            raise ConnectionError("network drop")
+        self.urls.append(url)
+        return self.fake_get(url)
+
+    def counting_get(self, url, **kwargs):
+        self.urls.append(url)
+        return self.fake_get(url)
+
+    def test_resume(self):
+        with patch("scrappers.scrappers.requests.get", side_effect=self.fake_get):
+            expected = str(self.scrapper.explore_reccursively("livre", 3))
+        self.scrapper.negative_cache = scrappers._cache.NegativeCache()
+        with patch("scrappers.scrappers.requests.get", side_effect=self.crashing_get):
+            with scrappers._journal.CrawlJournal(self.journal_path) as journal:
+                self.assertRaises(
+                    ConnectionError,
+                    self.scrapper.explore_reccursively,
+                    "livre",
+                    3,
+                    journal=journal,
+                )
+        with patch("scrappers.scrappers.requests.get", side_effect=self.counting_get):
+            with scrappers._journal.CrawlJournal(self.journal_path) as journal:
+                self.assertEqual(len(journal), 2)
+                g = self.scrapper.explore_reccursively("livre", 3, journal=journal)
+        self.assertEqual(str(g), expected)
+        # no page downloaded twice
+        self.assertEqual(len(self.urls), len(set(self.urls)))
+
+    def test_resume_after_truncated_line(self):
+        with scrappers._journal.CrawlJournal(self.journal_path) as journal:
+            journal.record("http://a/livre", ["bouquin", "ouvrage"])
+            journal.record("http://a/bouquin", ["livre"])
+        # the crawl stopped while writing the last line
+        with open(self.journal_path, "r+b") as f:
+            f.truncate(os.path.getsize(self.journal_path) - 5)
+        with scrappers._journal.CrawlJournal(self.journal_path) as journal:
+            self.assertEqual(len(journal), 1)
+            journal.record("http://a/ouvrage", ["oeuvre"])
+        with scrappers._journal.CrawlJournal(self.journal_path) as journal:
+            self.assertEqual(journal.get("http://a/livre"), ["bouquin", "ouvrage"])
+            self.assertIsNone(journal.get("http://a/bouquin"))
+            self.assertEqual(journal.get("http://a/ouvrage"), ["oeuvre"])
+
+    def test_languages_of_a_website(self):
+        english = scrappers.scrappers.SynonymsGetterReverso("en")
+        french = scrappers.scrappers.SynonymsGetterReverso("fr")
+        french.negative_cache = scrappers._cache.NegativeCache()
+        scrappers.scrappers.configure_rate_limiter(french.website, rate=1000, burst=100)
+        with scrappers._journal.CrawlJournal(self.journal_path) as journal:
+            journal.record(english._build_url("table"), ["board"])
+            with patch(
+                "scrappers.scrappers.requests.get", side_effect=self.counting_get
+            ):
+                french._get_crawl_results("table", journal)
+            self.assertEqual(self.urls, [french._build_url("table")])
+            self.assertEqual(len(journal), 2)
+
+
+class TestStreamedDownload(unittest.TestCase):
+
+    page = "<html><p>synonyms</p><footer>" + "x" * 100000 + "</footer></html>"
+
+    def setUp(self):
+        self.scrapper = scrappers.scrappers.SynonymsGetterCrisco2()
+        self.scrapper.chunk_size = 1000
+        scrappers.scrappers.configure_rate_limiter(
+            self.scrapper.website, rate=1000, burst=100
+        )
+
+    def test_max_body_size(self):
+        self.scrapper.max_body_size = 5000
+        with patch(
+            "scrappers.scrappers.requests.get",
+            return_value=fake_response(200, self.page),
+        ) as mocked_request:
+            r = self.scrapper._request("http://fakeurl.com")
+        self.assertTrue(mocked_request.call_args.kwargs["stream"])
+        self.assertEqual(len(r.content), 5000)
+        self.assertTrue(r.text.startswith("<html><p>synonyms</p>"))
+
+    def test_end_marker(self):
+        self.scrapper.end_marker = b"<footer>"
+        # the marker is split between two chunks
+        self.scrapper.chunk_size = 48
+        self.scrapper.page_cache = scrappers._cache.PageCache()
+        self.scrapper.negative_cache = scrappers._cache.NegativeCache()
+        page = '<html><a href="/des/synonymes/lire">lire</a><footer>' + "x" * 10000
+        with patch("scrappers.scrappers.requests.get") as mocked_request:
+            mocked_request.side_effect = lambda *a, **kw: fake_response(200, page)
+            r = self.scrapper._request("http://fakeurl.com")
+            self.assertTrue(r.body_complete)
+            self.assertTrue(r.text.endswith("<footer>"))
+            self.assertEqual(self.scrapper._get_results_from_website("livre"), ["lire"])
+        # the page stopped at the marker is complete and cached
+        self.assertEqual(len(self.scrapper.page_cache), 1)
+
+    def test_incomplete_pages_are_not_cached(self):
+        self.scrapper.max_body_size = 5000
+        self.scrapper.negative_cache = scrappers._cache.NegativeCache()
+        self.scrapper.page_cache = scrappers._cache.PageCache()
+        page = '<html><a href="/des/synonymes/lire">lire</a>' + "x" * 10000
+        with patch("scrappers.scrappers.requests.get") as mocked_request:
+            mocked_request.side_effect = lambda *a, **kw: fake_response(200, page)
+            self.assertEqual(self.scrapper._get_results_from_website("livre"), ["lire"])
+            mocked_request.side_effect = lambda *a, **kw: fake_response(
+                200, b"%PDF-1.4", {"Content-Type": "application/pdf"}
+            )
+            self.assertEqual(self.scrapper._get_results_from_website("lire"), [])
+        self.assertEqual(len(self.scrapper.page_cache), 0)
+        self.assertEqual(len(self.scrapper.negative_cache), 0)
+
+    def test_content_type(self):
+        with patch(
+            "scrappers.scrappers.requests.get",
+            return_value=fake_response(
+                200, b"%PDF-1.4", {"Content-Type": "application/pdf"}
+            ),
+        ):
+            self.assertEqual(self.scrapper.download_page("http://fakeurl.com"), "")
+
+
+class TestNegativeCache(unittest.TestCase):
+    def setUp(self):
+        self.scrapper = scrappers.scrappers.SynonymsGetterCrisco2()
+        self.scrapper.negative_cache = scrappers._cache.NegativeCache(ttl=60)
+        scrappers.scrappers.configure_rate_limiter(
+            self.scrapper.website, rate=1000, burst=100
+        )
+
+    def test_miss_is_not_downloaded_again(self):
+        with patch("scrappers.scrappers.requests.get") as mocked_request:
+            mocked_request.side_effect = lambda *a, **kw: fake_response(
+                404, "not found"
+            )
+            self.assertEqual(self.scrapper._get_results_from_website("xzy"), [])
+            self.assertEqual(self.scrapper._get_results_from_website("xzy"), [])
+            self.assertEqual(mocked_request.call_count, 1)
+        self.assertEqual(
+            self.scrapper.negative_cache.stats(),
+            {"entries": 1, "hits": 1, "bytes_saved": 9},
+        )
+
+    def test_errors_are_not_cached(self):
+        with patch("scrappers.scrappers.requests.get") as mocked_request:
+            mocked_request.side_effect = lambda *a, **kw: fake_response(500)
+            self.scrapper._get_results_from_website("xzy")
+            self.scrapper._get_results_from_website("xzy")
+            self.assertEqual(mocked_request.call_count, 2)
+
+    def test_expired(self):
+        self.scrapper.negative_cache.ttl = -1
+        self.scrapper.negative_cache.add("http://example.com")
+        self.assertFalse("http://example.com" in self.scrapper.negative_cache)
+
+
+class TestPageCache(unittest.TestCase):
+
+    page = '<html><a href="/des/synonymes/lire">lire</a></html>'
+
+    def fake_get(self, url, headers, **kwargs):
+        if headers.get("If-None-Match") == '"v1"':
+            return fake_response(304)
+        return fake_response(
+            200, self.page, {"Content-Type": "text/html", "ETag": '"v1"'}
+        )
+
+    def setUp(self):
+        self.path = "_pages.jsonl"
+        self.scrapper = scrappers.scrappers.SynonymsGetterCrisco2()
+        self.scrapper.negative_cache = scrappers._cache.NegativeCache()
+        self.scrapper.page_cache = scrappers._cache.PageCache(path=self.path)
+        scrappers.scrappers.configure_rate_limiter(
+            self.scrapper.website, rate=1000, burst=100
+        )
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_revalidation(self):
+        with patch(
+            "scrappers.scrappers.requests.get", side_effect=self.fake_get
+        ) as mocked_request:
+            self.assertEqual(self.scrapper._get_results_from_website("livre"), ["lire"])
+            self.assertEqual(self.scrapper._get_results_from_website("livre"), ["lire"])
+            self.assertEqual(mocked_request.call_count, 1)
+            # the entry expired
+            self.scrapper.page_cache.ttl = -1
+            self.scrapper.page_cache.refresh(self.scrapper._build_url("livre"))
+            self.assertEqual(self.scrapper._get_results_from_website("livre"), ["lire"])
+            self.assertEqual(mocked_request.call_count, 2)
+            self.assertEqual(
+                mocked_request.call_args.kwargs["headers"]["If-None-Match"], '"v1"'
+            )
+        self.assertEqual(
+            self.scrapper.page_cache.stats(),
+            {"entries": 1, "hits": 1, "revalidated": 2},
+        )
+
+    def test_persistence(self):
+        with patch("scrappers.scrappers.requests.get", side_effect=self.fake_get):
+            self.scrapper._get_results_from_website("livre")
+        cache = scrappers._cache.PageCache(path=self.path)
+        entry = cache.get(self.scrapper._build_url("livre"))
+        self.assertEqual(entry["words"], ["lire"])
+        self.assertEqual(cache.validators(entry), {"If-None-Match": '"v1"'})
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    page = '<html><a href="/des/synonymes/lire">lire</a></html>'
+
+    def slow_get(self, url, **kwargs):
+        time.sleep(0.2)
+        return fake_response(200, self.page)
+
+    def setUp(self):
+        self.scrapper = scrappers.scrappers.SynonymsGetterCrisco2()
+        scrappers.scrappers.configure_rate_limiter(
+            self.scrapper.website, rate=1000, burst=100
+        )
+
+    def test_threads_share_the_request(self):
+        with patch(
+            "scrappers.scrappers.requests.get", side_effect=self.slow_get
+        ) as mocked_request:
+            with ThreadPoolExecutor(4) as executor:
+                res = list(
+                    executor.map(self.scrapper._get_results_from_website, ["livre"] * 4)
+                )
+            self.assertEqual(mocked_request.call_count, 1)
+        self.assertEqual(res, [["lire"]] * 4)
+
+    def test_coroutines_share_the_request(self):
+        async def main():
+            return await asyncio.gather(
+                *[self.scrapper.get_results_async("bouquin") for _ in range(4)]
+            )
+
+        with patch(
+            "scrappers.scrappers.requests.get", side_effect=self.slow_get
+        ) as mocked_request:
+            res = asyncio.run(main())
+            self.assertEqual(mocked_request.call_count, 1)
+        self.assertEqual(res, [["lire"]] * 4)
+
+
+class TestScrapperRegistry(unittest.TestCase):
+    def test_created_on_first_use(self):
+        Crisco2 = unittest.mock.Mock(return_value="crisco2")
+        Reverso = unittest.mock.Mock(return_value="reverso")
+        registry = scrappers._registry.ScrapperRegistry(
+            {"fr": [Crisco2, (Reverso, "fr")], "en": [(Reverso, "en")]}
+        )
+        self.assertIn("fr", registry)
+        self.assertNotIn("xx", registry)
+        Reverso.assert_not_called()
+        self.assertEqual(registry["fr"], ["crisco2", "reverso"])
+        self.assertEqual(registry["fr"], ["crisco2", "reverso"])
+        Crisco2.assert_called_once_with()
+        Reverso.assert_called_once_with("fr")
+        self.assertRaises(KeyError, registry.__getitem__, "xx")
+
+    def test_register(self):
+        registry = scrappers._registry.ScrapperRegistry({})
+        registry.register("fr", scrappers.scrappers.SynonymsGetterReverso, "fr")
+        self.assertEqual(registry["fr"][0].lang, "fr")
+
+    def test_no_language_overwritten(self):
+        for lang in ("de", "it"):
+            websites = [s.website for s in scrappers.scrappers.scrappers[lang]]
+            self.assertIn("synonyms.reverso.net", websites)
+            self.assertEqual(len(websites), 2)
+
+
+class TestNormalizer(unittest.TestCase):
+    def test_pipeline(self):
+        normalize = scrappers._normalize.Normalizer(
+            scrappers._normalize.BRACKET_RULES + scrappers._normalize.DEFAULT_RULES
+        )
+        self.assertEqual(normalize("  Bouquin  (familier) "), "bouquin")
+        self.assertEqual(normalize("sníst <čeho> (hodně)"), "snist")
+        self.assertEqual(normalize("Œuvre  d'art"), "oeuvre d'art")
+        self.assertEqual(normalize("Œuvre  d'art"), "oeuvre d'art")
+        self.assertEqual(normalize.cache_info().hits, 1)
+
+    def test_language(self):
+        normalize = scrappers._normalize.get_normalizer("ru", unidecode_word=False)
+        self.assertEqual(normalize("Кни́га"), "книга")
+        self.assertIs(scrappers.scrappers.SynonymsSinonim().normalizer, normalize)
+        self.assertIsNot(scrappers._normalize.get_normalizer("ru"), normalize)
+
+    def test_brackets_are_opt_in(self):
+        # the dutch and german dictionaries keep their annotations
+        for scrapper in (
+            scrappers.scrappers.SynonymsMijnwoordenboek(),
+            scrappers.scrappers.SynonymsSynonymeDe(),
+        ):
+            self.assertEqual(scrapper._normalize_word("Boek  (het)"), "boek (het)")
+            self.assertEqual(scrapper._normalize_word("lesen <etw>"), "lesen <etw>")
+        self.assertEqual(
+            scrappers.scrappers.SynonymsSynonymus()._normalize_word("sníst <čeho>"),
+            "snist",
+        )
+
+    def test_nechybujtem_annotations(self):
+        html = '<span class="ths_syns1">kniha (zast. kniha), svazek</span>'
+        self.assertEqual(
+            sorted(
+                scrappers.scrappers.SynonymsGetterNechybujtem().extract_words_from_html(
+                    html
+                )
+            ),
+            ["kniha", "svazek"],
+        )
+
+    def test_register_rules(self):
+        scrappers._normalize.register_rules("xx", [(r"^to ", "")])
+        self.assertEqual(scrappers._normalize.get_normalizer("xx")("to Read"), "read")
+        self.assertEqual(
+            scrappers._normalize.get_normalizer("yy")("to Read"), "to read"
+        )
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.limiter = scrappers._rate_limiter.RateLimiter(
+            rate=100, burst=1, max_concurrency=4
+        )
+
+    def test_parse_retry_after(self):
+        self.assertEqual(scrappers._rate_limiter.parse_retry_after("120"), 120.0)
+        self.assertIsNone(scrappers._rate_limiter.parse_retry_after("soon"))
+        self.assertEqual(
+            scrappers._rate_limiter.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"),
+            0.0,
+        )
+
+    def test_backoff(self):
+        self.assertEqual(self.limiter.backoff(0, "2"), 2.0)
+        for attempt in range(5):
+            self.assertLessEqual(self.limiter.backoff(attempt), 2**attempt)
+
+    def test_concurrency_is_adaptive(self):
+        for _ in range(3):
+            self.limiter.record(error=True)
+        self.assertEqual(self.limiter.concurrency, 1)
+        for _ in range(10):
+            self.limiter.record(error=False)
+        self.assertEqual(self.limiter.concurrency, 4)
+
 
 unittest.main()